@@ -0,0 +1,24 @@
+import importlib
+
+# The numeric core (theoretical, approx, connectivity, nonlinear, montecarlo, 
+# layout) only needs numpy, and companion scipy. The rendering layer 
+# (circuit_mobjects, labels, gradients, static_layer) imports Manim, so submodules
+# are loaded on first access.
+__all__ = [
+    "approx",
+    "circuit_mobjects",
+    "companion",
+    "connectivity",
+    "gradients",
+    "labels",
+    "layout",
+    "montecarlo",
+    "nonlinear",
+    "static_layer",
+    "theoretical",
+]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,51 +1,77 @@
+import threading
+
 import numpy as np
-from scipy.integrate import solve_ivp
 
+from .connectivity import UnionFind, membership, source_cuts
+
+# Circuits with at least this many states get a sparse Jacobian
+SPARSE_JACOBIAN_SIZE = 64
+
+'''
+    Returns the times t_range[0] + k / fps that lie within t_range.
+'''
+def frame_times(t_range, fps):
+    frames = int(np.floor((t_range[1] - t_range[0]) * fps + 1e-9)) + 1
+    # The last frame can round to just past the end
+    return np.minimum(t_range[0] + np.arange(frames) / fps, t_range[1])
+
+'''
+    A transient sampled on a uniform frame grid (as returned by solve with fps). Values
+    at any time are looked up in O(1) by rounding to the nearest frame, so updaters 
+    never search or interpolate. Times outside the table clamp to its ends.
+'''
+class FrameTable:
+    def __init__(self, ts, rs, vs, fps=None):
+        self.ts = ts
+        self.rs = rs
+        self.vs = vs
+        self.t0 = ts[0]
+        if fps is None:
+            fps = (len(ts) - 1) / (ts[-1] - ts[0])
+        self.fps = fps
+
+    def __len__(self):
+        return len(self.ts)
+
+    def index(self, t):
+        k = int(round((t - self.t0) * self.fps))
+        return min(max(k, 0), len(self.ts) - 1)
+
+    def voltages(self, t):
+        return self.vs[:, self.index(t)]
+
+    def state(self, t):
+        return self.rs[:, self.index(t)]
+
+'''
+    Builds a circuit for transient analysis. Elements are added by node index, then
+    compile() freezes the circuit into a CompiledCircuit, which does the solving. The
+    solve methods here compile the circuit on every call; compile once and reuse the
+    model to solve repeatedly or concurrently.
+'''
 class ApproxCircuit:
-    states = {
-        "building",
-        "analyzing"
-    }
     def __init__(self, nodes, ground = 0):
         self.nodes = nodes
         self.ground = ground
         self.v = []
         self.i = []
         self.SN = []
-        self.SNsw = None
-        self.switch_equs = []
         self.dep_coeffs = []
         self.T = []
         self.Y = np.zeros((nodes, nodes))
-        self.NA = None
-        self.G = None
         self.C = []
         self.L = []
-        self.super_nodes = None
+        self.M = []
+        self.wires = []
 
         self.switch_info = []
         self.switch_events = []
         self.initial_switch_states = []
-        self.switch_states = None
-
-        self.A = None
-        self.e = None
-        self.r_to_v = None
-        self.t = 0
-
-        # state = "building" or "analyzing"
-        self.state = "building"
-    
-    def check_state(self, state):
-        if self.state != state:
-            raise ValueError()
     
     def add_resistor(self, r, i, j):
-        self.check_state("building")
         self.Y[i, j] = self.Y[j, i] = r
     
     def add_voltage_source(self, v, i, j):
-        self.check_state("building")
         self.v.append(v)
         equ = np.zeros(self.nodes)
         equ[i] = 1
@@ -54,21 +80,19 @@ class ApproxCircuit:
         self.dep_coeffs.append(np.zeros(self.nodes))
 
     def add_wire(self, i, j):
-        self.check_state("building")
-        self.add_voltage_source(0, i, j)
+        self.wires.append((i, j))
     
     def add_capacitor(self, c, i, j):
-        self.check_state("building")
+        # Capacitor rows come first, in v, SN and dep_coeffs alike
         self.v.insert(len(self.C), 0)
         equ = np.zeros(self.nodes)
         equ[i] = 1
         equ[j] = -1
-        self.SN.append(equ)
+        self.SN.insert(len(self.C), equ)
+        self.dep_coeffs.insert(len(self.C), np.zeros(self.nodes))
         self.C.append(c)
-        self.dep_coeffs.append(np.zeros(self.nodes))
     
     def add_dependant_voltage_source(self, a, i, j, di, dj):
-        self.check_state("building")
         self.v.append(0)
         equ = np.zeros(self.nodes)
         dep_coeffs = np.zeros(self.nodes)
@@ -76,11 +100,10 @@ class ApproxCircuit:
         equ[j] = -1
         dep_coeffs[di] -= a
         dep_coeffs[dj] += a
-        self.SN.insert(len(self.C), equ)
+        self.SN.append(equ)
         self.dep_coeffs.append(dep_coeffs)
     
     def add_current_source(self, ii, i, j):
-        self.check_state("building")
         self.i.append(ii)
         equ = np.zeros(self.nodes)
         equ[i] = 1
@@ -88,136 +111,235 @@ class ApproxCircuit:
         self.T.append(equ)
 
     def add_inductor(self, l, i, j):
-        self.check_state("building")
         self.i.insert(len(self.L), 0)
         equ = np.zeros(self.nodes)
         equ[i] = 1
         equ[j] = -1
         self.T.insert(len(self.L), equ)
         self.L.append(l)
+        return len(self.L) - 1
+
+    '''
+        Couples inductors a and b (indices returned by add_inductor) with mutual 
+        inductance m, e.g. the windings of a transformer. The dot of each winding is at
+        its node i.
+    '''
+    def add_mutual_inductance(self, m, a, b):
+        if a == b:
+            raise ValueError("An inductor cannot be coupled to itself")
+        self.M.append((a, b, m))
     
     def add_switch(self, i, j, initial_state=False):
-        self.check_state("building")
         self.switch_info.append((i, j))
         self.switch_events.append([])
         self.initial_switch_states.append(initial_state)
 
     def add_SPDT_switch(self, i, j, k, initial_state=False):
-        self.check_state("building")
         self.switch_info.append((i, j, k))
         self.switch_events.append([])
         self.initial_switch_states.append(initial_state)
     
     def add_switch_events(self, s, *events):
         self.switch_events[s] += events
-    
-    def reset_switch_states(self):
-        self.switch_states = self.initial_switch_states.copy()
-    
-    def _update_switches(self, old_t, t):
-        updated = False
-        switch_equs = []
-        for s in range(len(self.switch_info)):
-            for e in self.switch_events[s]:
-                if old_t < e and t >= e:
-                    updated = True
-                    self.switch_states[s] = not self.switch_states[s]
-                if not self.switch_states[s]:
-                    p, m, *_ = self.switch_info[s]
-                elif len(self.switch_info[s]) == 3:
-                    p, _, m = self.switch_info[s]
-                else:
-                    continue
-                equ = np.zeros(self.nodes)
-                equ[p] = 1
-                equ[m] = -1
-                switch_equs.append(equ)
-        if updated:
-            self.switch_equs = switch_equs
-        return updated
-
-
-    def _F(self, t, r):
-        old_t = self.t
-        if self._update_switches(old_t, t):
-            self._update_super_nodes()
-
-        self.t = t
-        return self.A @ r + self.e
-    
-    def _prepare_for_nodal_analysis(self):
-        self.SN = np.array(self.SN)
-        self.T = np.array(self.T).T
-        self.NA = self.Y.copy()
+
+    def compile(self):
+        return CompiledCircuit(self)
+
+    def solve(self, t_range, r0=None, t_eval=None, fps=None, period=None, method="RK45", **options):
+        return self.compile().solve(t_range, r0, t_eval, fps, period, method, **options)
+
+    def solve_frames(self, t_range, fps, r0=None, period=None, method="RK45", **options):
+        return self.compile().solve_frames(t_range, fps, r0, period, method, **options)
+
+    def solve_iter(self, t_range, r0=None, chunk_size=1024, method="RK45", period=None, **options):
+        return self.compile().solve_iter(t_range, r0, chunk_size, method, period, **options)
+
+    def solve_to_file(self, path, t_range, r0=None, chunk_size=1024, **kwargs):
+        return self.compile().solve_to_file(path, t_range, r0, chunk_size, **kwargs)
+
+'''
+    The linear system of a circuit for one set of switch states: dr/dt = A r + e, and
+    the node voltages v = r_to_v r.
+'''
+class SwitchedSystem:
+    def __init__(self, A, e, r_to_v, G, super_nodes, SNsw):
+        self.A = A
+        self.e = e
+        self.r_to_v = r_to_v
+        self.G = G
+        self.super_nodes = super_nodes
+        self.SNsw = SNsw
+
+'''
+    An ApproxCircuit frozen for analysis. The model is never modified after 
+    construction: switch states are a function of time and the system of every switch
+    configuration is built once and shared, so any number of solves, with different
+    t_range and r0, can run at once on one model (e.g. in a thread pool, since NumPy 
+    and the solvers release the GIL in their heavy parts).
+
+    A, e and r_to_v are those of the initial switch states.
+'''
+class CompiledCircuit:
+    def __init__(self, circuit):
+        self.nodes = circuit.nodes
+        self.ground = circuit.ground
+        self.C = tuple(circuit.C)
+        self.L = tuple(circuit.L)
+        self.M = tuple(circuit.M)
+        self.v = tuple(circuit.v)
+        self.i = tuple(circuit.i)
+        self.switch_info = tuple(circuit.switch_info)
+        self.switch_events = tuple(np.sort(events) for events in circuit.switch_events)
+        self.initial_switch_states = tuple(bool(state) for state in circuit.initial_switch_states)
+
+        # Merge the nodes joined by wires, so that wires cost neither a voltage source 
+        # nor a node. Everything below works on the reduced nodes; r_to_v maps back to
+        # the original ones.
+        self.labels = UnionFind(self.nodes).union_all(circuit.wires).labels()
+        self.reduced_nodes = self.labels.max() + 1
+        self.reduced_ground = self.labels[self.ground]
+        P = membership(self.labels)
+        self._expand = P.T
+
+        self.SN = np.array(circuit.SN).reshape(-1, self.nodes) @ P.T
+        self.dep_coeffs = np.array(circuit.dep_coeffs).reshape(-1, self.nodes) @ P.T
+        self.T = P @ np.array(circuit.T).T
+        # Resistors in parallel with a wire carry no current
+        self.NA = P @ (P @ circuit.Y).T
+        np.fill_diagonal(self.NA, 0)
         for i, eq in enumerate(self.NA):
             eq[i] = np.sum(eq)
-    
-    def _update_super_nodes(self):
-        self.check_state("analyzing")
-        if len(self.switch_equs) != 0:
-            self.SNsw = np.concatenate((self.SN, self.switch_equs))
+        for array in (self.labels, self.SN, self.dep_coeffs, self.T, self.NA):
+            array.flags.writeable = False
+
+        self._factor_inductances()
+
+        self._systems = {}
+        self._lock = threading.Lock()
+        system = self.system(self.initial_switch_states)
+        self.A = system.A
+        self.e = system.e
+        self.r_to_v = system.r_to_v
+
+    '''
+        Builds the inductance matrix in block sparse form. Only inductors coupled by 
+        mutual inductances share a block, so every block (e.g. the windings of one 
+        transformer) is Cholesky-factored on its own and uncoupled inductors are a 
+        plain division.
+    '''
+    def _factor_inductances(self):
+        from scipy import sparse
+        from scipy.linalg import cho_factor
+
+        Ri = len(self.L)
+        rows, cols = np.diag_indices(Ri)
+        values = list(self.L)
+        for a, b, m in self.M:
+            rows = np.append(rows, [a, b])
+            cols = np.append(cols, [b, a])
+            values += [m, m]
+        self.inductances = sparse.csr_array((values, (rows, cols)), shape=(Ri, Ri))
+
+        coupled = UnionFind(Ri).union_all((a, b) for a, b, _ in self.M).groups()
+        self._single_inductors = np.array([block[0] for block in coupled if len(block) == 1], dtype=int)
+        self._inductor_blocks = []
+        for block in coupled:
+            if len(block) == 1:
+                continue
+            L = self.inductances[block][:, block].toarray()
+            try:
+                self._inductor_blocks.append((block, cho_factor(L)))
+            except np.linalg.LinAlgError:
+                raise ValueError(f"Inductors {block.tolist()} have mutual inductances larger than their self inductances")
+
+    '''
+        Returns L^-1 rows, the rates of change of the inductor currents for the 
+        inductor voltages rows.
+    '''
+    def _solve_inductances(self, rows):
+        from scipy.linalg import cho_solve
+
+        result = np.empty_like(rows, dtype=float)
+        singles = self._single_inductors
+        result[singles] = rows[singles] / np.array(self.L)[singles, None]
+        for block, factor in self._inductor_blocks:
+            result[block] = cho_solve(factor, rows[block])
+        return result
+
+    '''
+        Returns the switch states at t of a solve that started at t0: every event in 
+        (t0, t] toggles its switch.
+    '''
+    def switch_states(self, t0, t):
+        return tuple(
+            initial != bool((np.searchsorted(events, t, side="right") - np.searchsorted(events, t0, side="right")) % 2)
+            for initial, events in zip(self.initial_switch_states, self.switch_events)
+        )
+
+    '''
+        Returns the SwitchedSystem of switch_states, building it on first use.
+    '''
+    def system(self, switch_states):
+        system = self._systems.get(switch_states)
+        if system is None:
+            with self._lock:
+                system = self._systems.get(switch_states)
+                if system is None:
+                    system = self._systems[switch_states] = self._build_system(switch_states)
+        return system
+
+    def _switch_equs(self, switch_states):
+        switch_equs = []
+        for info, state in zip(self.switch_info, switch_states):
+            if not state:
+                p, m, *_ = info
+            elif len(info) == 3:
+                p, _, m = info
+            else:
+                continue
+            equ = np.zeros(self.reduced_nodes)
+            equ[self.labels[p]] += 1
+            equ[self.labels[m]] -= 1
+            switch_equs.append(equ)
+        return switch_equs
+
+    def _build_system(self, switch_states):
+        switch_equs = self._switch_equs(switch_states)
+        if len(switch_equs) != 0:
+            SNsw = np.concatenate((self.SN, switch_equs))
         else:
-            self.SNsw = self.SN.copy()
+            SNsw = self.SN.copy()
         # len(SNsw) = #VSs
         # len(T.T)  = #CSs
-        V = len(self.SNsw)
+        V = len(SNsw)
         I = len(self.T.T)
         Rv = len(self.C)
         Ri = len(self.L)
 
-        # Find super nodes
-        super_nodes = [{x} for x in range(self.nodes)]
-        non_base = set()
-        for vs in self.SNsw:
-            i, j = np.argwhere(vs)[:, 0]
-            i, j = (i, j) if i < j else (j, i)
-            super_nodes[i].update(super_nodes[j])
-            super_nodes[j] = super_nodes[i]
-            non_base.add(j)
-        super_nodes = np.array([
-            [1 if n in super_nodes[j] else 0 for n in range(self.nodes)]
-            for j in range(self.nodes)
-            if j not in non_base
-        ])
-        self.super_nodes = super_nodes
-
-        # Calculate G
-        self.G = np.zeros((V, self.nodes))
-        for i, n in enumerate(self.G):
-            plus = np.argwhere(self.SNsw[i] == 1)[0, 0]
-            checked_vss = {i}
-            n[plus] = 1
-            queue = [plus]
-            while len(queue) != 0:
-                node = queue.pop(0)
-                vss = (vs for vs in np.argwhere(self.SNsw[:, node])[:, 0] if vs not in checked_vss)
-                for vs in vss:
-                    head, tail = np.argwhere(self.SNsw[vs])[:, 0]
-                    node = head if head != node else tail
-                    checked_vss.add(vs)
-                    n[node] = 1
-                    queue.append(node)
+        # Find super nodes and G, the positive side of each voltage source
+        plus = np.argmax(SNsw == 1, axis=1)
+        minus = np.argmax(SNsw == -1, axis=1)
+        labels, G = source_cuts(self.reduced_nodes, plus, minus)
+        super_nodes = membership(labels)
         
-        NAprime = (self.super_nodes @ self.NA)[:-1]
-        Tprime = (self.super_nodes @ self.T)[:-1]
-        gnd_equ = np.zeros((1, self.nodes))
-        gnd_equ[0, self.ground] = 1
-        D = np.concatenate((self.SNsw, NAprime, gnd_equ))
+        NAprime = (super_nodes @ self.NA)[:-1]
+        Tprime = (super_nodes @ self.T)[:-1]
+        gnd_equ = np.zeros((1, self.reduced_nodes))
+        gnd_equ[0, self.reduced_ground] = 1
+        D = np.concatenate((SNsw, NAprime, gnd_equ))
         D_inv = np.linalg.inv(D)
         
-        temp1 = np.zeros((self.nodes, V + I))
+        temp1 = np.zeros((self.reduced_nodes, V + I))
         temp1[:V, :V] = np.identity(V)
         temp1[-2, -I:] = Tprime
         temp1[-1, -1] = 0
 
         temp3 = np.zeros((Rv, Rv))
-        temp4 = np.zeros((Ri, Ri))
         np.fill_diagonal(temp3, self.C)
-        np.fill_diagonal(temp4, self.L)
         temp5 = np.zeros((Rv + Ri, V + I))
         r_to_y = np.zeros((V + I, Rv + Ri))
         temp5[:Rv, :Rv] = temp3
-        temp5[-Ri:, -Ri:] = temp4
+        temp5[-Ri:, -Ri:] = np.identity(Ri)
         r_to_y[:Rv, :Rv] = np.identity(Rv)
         r_to_y[-Ri:, -Ri:] = np.identity(Ri)
         
@@ -226,28 +348,253 @@ class ApproxCircuit:
         temp7 = np.concatenate((np.zeros((V, I)), np.identity(I)))
         temp8 = np.concatenate((np.zeros((I, V)), np.identity(I)), axis=1)
 
-        sources = np.array(self.v + self.i)
+        # Closed switches are zero volt sources
+        sources = np.concatenate((self.v, np.zeros(len(switch_equs)), self.i))
 
-        A = temp5 @ (temp6 @ (self.G @ self.NA @ D_inv @ temp1 + self.G @ self.T @ temp8) + temp7 @ self.T.T @ D_inv @ temp1)
+        A = temp5 @ (temp6 @ (G @ self.NA @ D_inv @ temp1 + G @ self.T @ temp8) + temp7 @ self.T.T @ D_inv @ temp1)
+        # The inductor rows are voltages; L di/dt = v
+        A[Rv:] = self._solve_inductances(A[Rv:])
         e = A @ sources
         A = A @ r_to_y
 
-        self.SNsw += np.array(self.dep_coeffs + [[0] * self.nodes] * len(self.switch_equs))
-        self.A = A
-        self.e = e
-        self.r_to_v = D_inv @ temp1 @ r_to_y
+        SNsw[:len(self.SN)] += self.dep_coeffs
+        r_to_v = self._expand @ (D_inv @ temp1 @ r_to_y)
+        for array in (A, e, r_to_v, SNsw):
+            array.flags.writeable = False
+        return SwitchedSystem(A, e, r_to_v, G, super_nodes, SNsw)
+
+    '''
+        Returns the switch event times in the open interval (t0, t1), sorted.
+    '''
+    def event_times(self, t0, t1):
+        if len(self.switch_events) == 0:
+            return np.empty(0)
+        events = np.unique(np.concatenate(self.switch_events))
+        return events[(events > t0) & (events < t1)]
+
+    '''
+        Splits t_range at the switch events into (start, end, system) intervals, where
+        system is the SwitchedSystem that holds over the whole interval. The state is
+        smooth within an interval, so solvers integrate each one separately and are 
+        restarted at every event instead of stepping over it.
+    '''
+    def _segments(self, t_range):
+        t0, t1 = t_range
+        bounds = np.concatenate(([t0], self.event_times(t0, t1), [t1]))
+        return [
+            (start, end, self.system(self.switch_states(t0, (start + end) / 2)))
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    '''
+        Returns dr/dt as a function of (t, r) for system.
+    '''
+    def _rhs(self, system):
+        def F(t, r):
+            return system.A @ r + system.e
+        return F
+
+    '''
+        Resolves method to an OdeSolver class and completes its options. Besides the
+        scipy methods, method can be "trapezoidal" or "backward_euler" for the fixed 
+        step companion model solvers (see companion.py), which step once per frame 
+        with fps unless given a step. With system, the implicit scipy methods (Radau,
+        BDF, LSODA) get its exact, constant Jacobian, which is sparse for large 
+        circuits.
+    '''
+    def _solver(self, method, t_range, options, fps=None, system=None):
+        from scipy import integrate
+        from scipy.sparse import csc_array
+        from . import companion
+
+        options = dict(options)
+        if isinstance(method, str):
+            method = companion.METHODS.get(method) or getattr(integrate, method)
+        if issubclass(method, companion.CompanionSolver):
+            options.setdefault("circuit", self)
+            options.setdefault("t_start", t_range[0])
+            options.setdefault("step", 1 / fps if fps is not None else abs(t_range[1] - t_range[0]) / 1000)
+        elif method in (integrate.Radau, integrate.BDF, integrate.LSODA):
+            # LSODA only takes dense Jacobians
+            sparse = method is not integrate.LSODA and len(self.C) + len(self.L) >= SPARSE_JACOBIAN_SIZE
+            if system is not None:
+                options.setdefault("jac", csc_array(system.A) if sparse else system.A)
+        return method, options
+
+    '''
+        Returns the node voltages of the states rs at times ts of a solve starting at 
+        t0, with the r_to_v of the switch states at each time.
+    '''
+    def _voltages(self, t0, ts, rs):
+        if len(self.switch_info) == 0:
+            return self.r_to_v @ rs
+        configs = [self.switch_states(t0, t) for t in ts]
+        vs = np.empty((self.nodes, len(ts)))
+        for config in set(configs):
+            mask = np.array([c == config for c in configs])
+            vs[:, mask] = self.system(config).r_to_v @ rs[:, mask]
+        return vs
+
+    '''
+        Returns the DC operating point at t0: the state r where A r + e = 0 for the 
+        switch states at t0, i.e. where every capacitor current and inductor voltage 
+        is zero. If A is singular (e.g. a capacitor loop or an inductor cutset) the
+        least squares solution is returned.
+    '''
+    def steady_state(self, t0=0):
+        system = self.system(self.switch_states(t0, t0))
+        try:
+            return np.linalg.solve(system.A, -system.e)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(system.A, -system.e, rcond=None)[0]
+
+    '''
+        Returns the periodic steady state of a circuit switched with the given period:
+        the state r0 at t0 that the circuit returns to at t0 + period. The circuit is
+        linear between switch events, so r(t0 + period) = M r0 + c, and M and c are 
+        found by shooting once over a period with the N + 1 columns [r | Phi] 
+        integrated together. Then (I - M) r0 = c is solved, by least squares if 
+        singular. options are passed to solve_ivp.
+    '''
+    def periodic_steady_state(self, period, t0=0, **options):
+        from scipy.integrate import solve_ivp
 
-    def solve(self, t_range, r0=None):
-        self.state = "analyzing"
-        self._prepare_for_nodal_analysis()
-        self.reset_switch_states()
-        self._update_switches(t_range[0], t_range[0])
-        self._update_super_nodes()
+        N = len(self.C) + len(self.L)
+        def shoot(system):
+            def F(t, y):
+                R = y.reshape(N, N + 1)
+                dR = system.A @ R
+                dR[:, 0] += system.e
+                return dR.ravel()
+            return F
 
+        options = {"rtol": 1e-8, "atol": 1e-10, **options}
+        y = np.concatenate((np.zeros((N, 1)), np.identity(N)), axis=1).ravel()
+        for start, end, system in self._segments((t0, t0 + period)):
+            sol = solve_ivp(shoot(system), (start, end), y, **options)
+            if not sol.success:
+                raise RuntimeError(sol.message)
+            y = sol.y[:, -1]
+        R = y.reshape(N, N + 1)
+        c = R[:, 0]
+        M = R[:, 1:]
+        try:
+            return np.linalg.solve(np.identity(N) - M, c)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(np.identity(N) - M, c, rcond=None)[0]
+
+    '''
+        r0 is the initial state, zeros by default, "steady" for the DC operating point,
+        or "periodic" for the periodic steady state of the given switching period.
+    '''
+    def _initial_state(self, r0, t0=0, period=None):
         if r0 is None:
             r0 = np.zeros(len(self.C) + len(self.L))
-        sol = solve_ivp(self._F, t_range, r0)
-        ts = sol.t
-        rs = sol.y
-        vs = self.r_to_v @ rs
+        elif isinstance(r0, str):
+            if r0 == "steady":
+                r0 = self.steady_state(t0)
+            elif r0 == "periodic":
+                if period is None:
+                    raise ValueError("r0=\"periodic\" needs the switching period")
+                r0 = self.periodic_steady_state(period, t0)
+            else:
+                raise ValueError(f"Unknown initial state {r0!r}")
+        return r0
+
+    '''
+        Integrates the circuit over t_range and returns ts, rs (the capacitor voltages
+        and inductor currents) and vs (the node voltages), each with time along the 
+        last axis. By default the adaptive steps of the solver are returned. With 
+        t_eval, or fps to sample an animation's frame grid t_range[0] + k / fps, the 
+        solution is evaluated at exactly those times from the solver's dense output.
+        The interval between each pair of switch events is integrated separately (see
+        _segments). See _initial_state for r0 and period, and _solver for method. 
+        options are passed to the solver.
+    '''
+    def solve(self, t_range, r0=None, t_eval=None, fps=None, period=None, method="RK45", **options):
+        from scipy.integrate import solve_ivp
+
+        if fps is not None:
+            t_eval = frame_times(t_range, fps)
+        r = self._initial_state(r0, t_range[0], period)
+        segments = self._segments(t_range)
+        ts = []
+        rs = []
+        for k, (start, end, system) in enumerate(segments):
+            segment_method, segment_options = self._solver(method, t_range, options, fps, system)
+            sol = solve_ivp(self._rhs(system), (start, end), r, method=segment_method, dense_output=t_eval is not None, **segment_options)
+            if not sol.success:
+                raise RuntimeError(sol.message)
+            if t_eval is None:
+                # Every segment starts at the state the last one ended at
+                first = 0 if k == 0 else 1
+                ts.append(sol.t[first:])
+                rs.append(sol.y[:, first:])
+            else:
+                last = k == len(segments) - 1
+                inside = (t_eval >= start) & ((t_eval <= end) if last else (t_eval < end))
+                if inside.any():
+                    ts.append(t_eval[inside])
+                    rs.append(sol.sol(t_eval[inside]))
+            r = sol.y[:, -1]
+        if len(ts) == 0:
+            ts = np.empty(0)
+            rs = np.empty((len(r), 0))
+        else:
+            ts = np.concatenate(ts)
+            rs = np.concatenate(rs, axis=1)
+        vs = self._voltages(t_range[0], ts, rs)
         return ts, rs, vs
+
+    '''
+        Solves the circuit on the frame grid of an animation at fps and returns a 
+        FrameTable for constant time lookups from scene updaters.
+    '''
+    def solve_frames(self, t_range, fps, r0=None, period=None, method="RK45", **options):
+        return FrameTable(*self.solve(t_range, r0, fps=fps, period=period, method=method, **options), fps=fps)
+
+    '''
+        Integrates like solve(), but yields (ts, rs, vs) chunks of at most chunk_size 
+        steps while the integration proceeds instead of returning everything at the 
+        end, so memory stays bounded for long transients and rendering can start 
+        before the simulation ends. method is resolved by _solver, and options are 
+        passed to it.
+    '''
+    def solve_iter(self, t_range, r0=None, chunk_size=1024, method="RK45", period=None, **options):
+        r = self._initial_state(r0, t_range[0], period)
+        ts = [t_range[0]]
+        rs = [np.array(r, dtype=float)]
+        for start, end, system in self._segments(t_range):
+            segment_method, segment_options = self._solver(method, t_range, options, system=system)
+            solver = segment_method(self._rhs(system), start, r, end, **segment_options)
+            while solver.status == "running":
+                message = solver.step()
+                if solver.status == "failed":
+                    raise RuntimeError(message)
+                ts.append(solver.t)
+                rs.append(solver.y.copy())
+                if len(ts) >= chunk_size:
+                    yield self._make_chunk(t_range[0], ts, rs)
+                    ts, rs = [], []
+            r = solver.y.copy()
+        if len(ts) != 0:
+            yield self._make_chunk(t_range[0], ts, rs)
+
+    def _make_chunk(self, t0, ts, rs):
+        ts = np.array(ts)
+        rs = np.array(rs).T
+        return ts, rs, self._voltages(t0, ts, rs)
+
+    '''
+        Streams solve_iter() into a raw float64 file at path, one row (t, r, v) per 
+        step, and returns ts, rs, vs as read-only memory-mapped views of it.
+    '''
+    def solve_to_file(self, path, t_range, r0=None, chunk_size=1024, **kwargs):
+        steps = 0
+        with open(path, "wb") as f:
+            for ts, rs, vs in self.solve_iter(t_range, r0, chunk_size, **kwargs):
+                np.concatenate((ts[None], rs, vs)).T.astype(np.float64).tofile(f)
+                steps += len(ts)
+        R = len(self.C) + len(self.L)
+        data = np.memmap(path, dtype=np.float64, mode="r", shape=(steps, 1 + R + self.nodes))
+        return data[:, 0], data[:, 1:1 + R].T, data[:, 1 + R:].T
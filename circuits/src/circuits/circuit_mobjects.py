@@ -1,6 +1,7 @@
 from manim import *
 
 from . import theoretical as tl
+from .labels import cached_text
 
 def perp(coord : np.ndarray) -> np.ndarray:
     retval = coord.copy()
@@ -39,6 +40,10 @@ class CircuitMobject(VGroup):
         self.end = end
 
 class CircuitElementMobject(CircuitMobject):
+    # How set_voltages colors each submobject: by the voltage at the head ("high"), at
+    # the tail ("low"), by a gradient from one to the other, or not at all (None)
+    voltage_roles = ()
+
     def __init__(self, start, end, component_width=0.5, component_length=0.7, 
                 do_colored_voltage=False, base_v=0, diff_v=0, w=0,
                 reverse_label=False, *args, **kwargs):
@@ -58,7 +63,7 @@ class CircuitElementMobject(CircuitMobject):
         self.w = w
 
     def _add_label(self, label):
-        self._label = Text(label).scale(0.6).next_to(self._midpoint, perp(self._rhat) * (-1 if self._reverse_label else 1), 
+        self._label = cached_text(label).scale(0.6).next_to(self._midpoint, perp(self._rhat) * (-1 if self._reverse_label else 1), 
             buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER + self._component_width / 2)
         self.add(self._label)
 
@@ -71,6 +76,18 @@ class CircuitElementMobject(CircuitMobject):
             buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER + self._component_width / 2)
     
     def set_time(self, time):
+        if not self.do_colored_voltage:
+            return
+        self.set_voltages(
+            phasor2real(self.base_v + self.diff_v, self.w, time),
+            phasor2real(self.base_v, self.w, time)
+        )
+
+    '''
+        Colors the element given the instantaneous voltages at its head (high) and
+        tail (low). Used directly by ACCircuit, which evaluates every node at once.
+    '''
+    def set_voltages(self, high, low):
         raise NotImplementedError()
     
     def get_start_color(self, time):
@@ -125,6 +142,8 @@ class ResistorElement(TipableVMobject):
         self.set_anchors_and_handles(anchors[:-1], handles1, handles2, anchors[1:])
 
 class Resistor(CircuitElementMobject):
+    voltage_roles = ("high", "gradient", "low")
+
     def __init__(self, start=LEFT, end=RIGHT, component_length=0.8, component_width=0.4, points=6, label=None, *args, **kwargs):
         super().__init__(start, end, component_length=component_length, component_width=component_width, *args, **kwargs)
         rstart = self._midpoint - self._rhat * component_length / 2
@@ -141,18 +160,16 @@ class Resistor(CircuitElementMobject):
         if label is not None:
             self._add_label(label)
 
-    def set_time(self, time):
+    def set_voltages(self, high, low):
         if not self.do_colored_voltage:
             return
-        self[0].set_color(self.get_start_color(time))
-
-        low = phasor2real(self.base_v, self.w, time)
-        high = phasor2real(self.base_v + self.diff_v, self.w, time)
+        self[0].set_color(get_voltage_color(high))
         self[1].set_color(get_voltage_color_gradient(high, low))
-
-        self[2].set_color(self.get_end_color(time))
+        self[2].set_color(get_voltage_color(low))
 
 class Capacitor(CircuitElementMobject):
+    voltage_roles = ("high", "high", "low", "low")
+
     def __init__(self, start=LEFT, end=RIGHT, component_length=0.2, component_width=0.4, label=None, *args, **kwargs):
         super().__init__(start, end, component_length=component_length, component_width=component_width, *args, **kwargs)
         cstart = self._midpoint - self._rhat * component_length / 2
@@ -168,14 +185,14 @@ class Capacitor(CircuitElementMobject):
         if label is not None:
             self._add_label(label)
 
-    def set_time(self, time):
+    def set_voltages(self, high, low):
         if not self.do_colored_voltage:
             return
-        start_color = self.get_start_color(time)
+        start_color = get_voltage_color(high)
         self[0].set_color(start_color)
         self[1].set_color(start_color)
 
-        end_color = self.get_end_color(time)
+        end_color = get_voltage_color(low)
         self[2].set_color(end_color)
         self[3].set_color(end_color)
 
@@ -229,6 +246,8 @@ class InductorElement(TipableVMobject):
         self.set_anchors_and_handles(anchors[:-1], handles1, handles2, anchors[1:])
 
 class Inductor(CircuitElementMobject):
+    voltage_roles = ("high", "gradient", "low")
+
     def __init__(self, start=LEFT, end=RIGHT, inductor_length=1, inductor_width=0.4, loops=5, loop_width=0.2, label=None, *args, **kwargs):
         super().__init__(start, end, *args, **kwargs)
         lstart = self._midpoint - self._rhat * inductor_length / 2
@@ -244,18 +263,16 @@ class Inductor(CircuitElementMobject):
         if label is not None:
             self._add_label(label)
 
-    def set_time(self, time):
+    def set_voltages(self, high, low):
         if not self.do_colored_voltage:
             return
-        self[0].set_color(self.get_start_color(time))
-
-        low = phasor2real(self.base_v, self.w, time)
-        high = phasor2real(self.base_v + self.diff_v, self.w, time)
+        self[0].set_color(get_voltage_color(high))
         self[1].set_color(get_voltage_color_gradient(high, low))
-
-        self[2].set_color(self.get_end_color(time))
+        self[2].set_color(get_voltage_color(low))
 
 class IndependantVoltage(CircuitElementMobject):
+    voltage_roles = ("high", None, None, None, None, "low")
+
     def __init__(self, start=LEFT, end=RIGHT, voltage_size=0.5, label=None, *args, **kwargs):
         super().__init__(start, end, component_length=voltage_size, component_width=voltage_size, *args, **kwargs)
         vstart = self._midpoint - self._rhat * voltage_size / 2
@@ -280,24 +297,249 @@ class IndependantVoltage(CircuitElementMobject):
             self._add_label(label)
             
 
-    def set_time(self, time):
+    def set_voltages(self, high, low):
         if not self.do_colored_voltage:
             return
-        self[0].set_color(self.get_start_color(time))
+        self[0].set_color(get_voltage_color(high))
+
+        self[5].set_color(get_voltage_color(low))
+
+class IndependantCurrent(CircuitElementMobject):
+    voltage_roles = ("high", None, None, "low")
 
-        self[5].set_color(self.get_end_color(time))
+    def __init__(self, start=LEFT, end=RIGHT, current_size=0.5, label=None, *args, **kwargs):
+        super().__init__(start, end, component_length=current_size, component_width=current_size, *args, **kwargs)
+        cstart = self._midpoint - self._rhat * current_size / 2
+        cend = self._midpoint + self._rhat * current_size / 2
+
+        self.add(Line(start, cstart))
+
+        self.add(Circle(color=WHITE, radius=current_size/2, fill_opacity=0).shift(self._midpoint))
+
+        # Points from head to tail, the direction of the source's current
+        self.add(Arrow(
+            self._midpoint - self._rhat * current_size * 0.3,
+            self._midpoint + self._rhat * current_size * 0.3,
+            buff=0, stroke_width=3, max_tip_length_to_length_ratio=0.4
+        ))
+
+        self.add(Line(cend, end))
+        self.set_time(0)
+
+        if label is not None:
+            self._add_label(label)
+
+    def set_voltages(self, high, low):
+        if not self.do_colored_voltage:
+            return
+        self[0].set_color(get_voltage_color(high))
+
+        self[3].set_color(get_voltage_color(low))
 
 class Wire(CircuitElementMobject):
+    voltage_roles = ("high",)
+
     def __init__(self, start=LEFT, end=RIGHT, *args, **kwargs):
         super().__init__(start, end, *args, **kwargs)
         self.add(Line(start, end))
         self.set_time(0)
 
-    def set_time(self, time):
+    def set_voltages(self, high, low):
         if not self.do_colored_voltage:
             return
-        self[0].set_color(self.get_start_color(time))
+        self[0].set_color(get_voltage_color(high))
+
+
+
+'''
+    Level of detail for large schematics. An element spanning fewer than 
+    DETAIL_THRESHOLD pixels on screen is drawn as a single line, and labels and 
+    current dots smaller than SUBPIXEL pixels are not drawn at all.
+'''
+DETAIL_THRESHOLD = 8
+SUBPIXEL = 1
+
+'''
+    Returns the number of pixels per unit of camera, following the frame of a 
+    MovingCamera as it zooms.
+'''
+def pixels_per_unit(camera):
+    frame = getattr(camera, "frame", None)
+    frame_width = frame.width if frame is not None else camera.frame_width
+    return camera.pixel_width / frame_width
+
+'''
+    An element drawn either in full, by the mobject make_detailed returns, or as a 
+    line from start to end colored by its voltages. The detailed mobject is only built
+    the first time it is shown. See ACCircuit's camera argument.
+'''
+class LODElement(CircuitMobject):
+    def __init__(self, start, end, make_detailed, do_colored_voltage=False, *args, **kwargs):
+        super().__init__(start, end)
+        self._make_detailed = make_detailed
+        self.detailed = None
+        self.simple = Line(start, end)
+        self.do_colored_voltage = do_colored_voltage
+        self.level = None
+        self.show_label = True
+        self._voltages = None
+        self.set_level("simple")
 
+    def get_detailed(self):
+        if self.detailed is None:
+            self.detailed = self._make_detailed()
+            self._label = getattr(self.detailed, "_label", None)
+        return self.detailed
+
+    def get_label(self):
+        self.get_detailed()
+        return self._label
+
+    def set_level(self, level, show_label=True):
+        if level == self.level and show_label == self.show_label:
+            return
+        mobject = self.get_detailed() if level == "detailed" else self.simple
+        if level == "detailed" and self._label is not None:
+            if show_label and self._label not in mobject.submobjects:
+                mobject.add(self._label)
+            elif not show_label:
+                mobject.remove(self._label)
+        self.level = level
+        self.show_label = show_label
+        self.remove(*self.submobjects)
+        self.add(mobject)
+        if self._voltages is not None:
+            self.set_voltages(*self._voltages)
+
+    def set_voltages(self, high, low):
+        if not self.do_colored_voltage:
+            return
+        self._voltages = (high, low)
+        if self.level == "detailed":
+            self.detailed.set_voltages(high, low)
+        else:
+            self.simple.set_color([get_voltage_color(high), get_voltage_color(low)])
+
+
+'''
+    The static geometry of many element mobjects merged into a few VMobjects, one per
+    stroke style, each holding the curves of every element drawn in that style as 
+    subpaths of a single concatenated points array. Cairo then sets the style and 
+    strokes once per style instead of once per submobject. Filled parts (labels, arrow
+    tips) can't be merged and are kept as they are.
+
+    With do_colored_voltage, the curves colored by set_voltages are instead bucketed
+    by their voltage, quantized to levels steps on either side of ground, so there is
+    one VMobject per color actually on screen. They are only regrouped on frames where
+    a curve changes level.
+'''
+class StaticPaths(VGroup):
+    def __init__(self, elements, do_colored_voltage=False, levels=16, *args, **kwargs):
+        super().__init__()
+        self.levels = levels
+        self.colors = []
+        self.widths = []
+        self.unmerged = VGroup()
+
+        curves, elems, ts, colors, widths = [], [], [], [], []
+        for k, mobject in enumerate(elements):
+            for n, submobject in enumerate(mobject.submobjects):
+                roles = mobject.voltage_roles if do_colored_voltage else ()
+                role = roles[n] if n < len(roles) else None
+                for leaf in submobject.family_members_with_points():
+                    if not isinstance(leaf, VMobject) or leaf.get_fill_opacity() > 0:
+                        self.unmerged.add(leaf)
+                        continue
+                    points = leaf.points.reshape(-1, 4, 3)
+                    m = len(points)
+                    curves.append(points)
+                    elems.append(np.full(m, k))
+                    if role == "gradient":
+                        ts.append((np.arange(m) + 0.5) / m)
+                    else:
+                        ts.append(np.full(m, np.nan if role is None else float(role == "low")))
+                    colors.append(np.full(m, self._index(self.colors, rgb_to_hex(color_to_rgb(leaf.get_stroke_color())))))
+                    widths.append(np.full(m, self._index(self.widths, leaf.get_stroke_width())))
+
+        self._curves = np.concatenate(curves) if curves else np.zeros((0, 4, 3))
+        self._elems = np.concatenate(elems).astype(int) if elems else np.zeros(0, dtype=int)
+        self._ts = np.concatenate(ts) if ts else np.zeros(0)
+        self._colors = np.concatenate(colors).astype(int) if colors else np.zeros(0, dtype=int)
+        self._widths = np.concatenate(widths).astype(int) if widths else np.zeros(0, dtype=int)
+        self._dynamic = ~np.isnan(self._ts)
+
+        # Colors of the voltage levels follow the fixed colors
+        self._level_colors = [
+            get_voltage_color(np.tan(level / levels * np.pi / 2))
+            for level in range(-levels + 1, levels)
+        ]
+        self._paths = {}
+        self._groups = {}
+        self._keys = None
+        self.add(self.unmerged)
+        self._draw(self._colors)
+
+    @staticmethod
+    def _index(values, value):
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    '''
+        Regroups the curves into one path per stroke width and color. The curves are
+        read back from the paths first, so shifts, scales and rotations of the group
+        since the last regrouping are kept.
+    '''
+    def _draw(self, colors):
+        keys = self._widths * (len(self.colors) + len(self._level_colors)) + colors
+        if self._keys is not None and np.array_equal(keys, self._keys):
+            return
+        for key, group in self._groups.items():
+            points = self._paths[key].points
+            if len(points) == 4 * len(group):
+                self._curves[group] = points.reshape(-1, 4, 3)
+        self._keys = keys
+        self._groups = {}
+
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        groups = np.split(order, starts[1:])
+        drawn = set()
+        for key, group in zip(unique, groups):
+            width, color = divmod(int(key), len(self.colors) + len(self._level_colors))
+            path = self._paths.get(key)
+            if path is None:
+                path = self._paths[key] = VMobject()
+                self.add_to_back(path)
+            path.set_points(self._curves[group].reshape(-1, 3))
+            path.set_stroke(color=self._color(color), width=self.widths[width])
+            self._groups[key] = group
+            drawn.add(key)
+        for key, path in self._paths.items():
+            if key not in drawn and path.has_points():
+                path.clear_points()
+
+    def _color(self, index):
+        if index < len(self.colors):
+            return self.colors[index]
+        return self._level_colors[index - len(self.colors)]
+
+    '''
+        Recolors the dynamic curves given the instantaneous voltages at the heads and 
+        tails of all elements, as arrays.
+    '''
+    def set_voltages(self, highs, lows):
+        if not self._dynamic.any():
+            return
+        highs = np.asarray(highs)[self._elems[self._dynamic]]
+        lows = np.asarray(lows)[self._elems[self._dynamic]]
+        v = highs + self._ts[self._dynamic] * (lows - highs)
+        v = np.nan_to_num(v)
+        level = np.rint(np.arctan(v) / (np.pi / 2) * self.levels).astype(int)
+        level = np.clip(level, -self.levels + 1, self.levels - 1)
+        colors = self._colors.copy()
+        colors[self._dynamic] = len(self.colors) + level + self.levels - 1
+        self._draw(colors)
 
 
 class Current(CircuitMobject):
@@ -311,10 +553,17 @@ class Current(CircuitMobject):
 
     def set_time(self, time):
         self.time = time
+        self.set_displacement(tl.displacements_at(self.i, self.w, time))
+
+    '''
+        Places the dots given the charge displaced through the element since time 
+        zero. Used directly by ACCircuit, which evaluates every branch at once.
+    '''
+    def set_displacement(self, displacement):
         r = self.start - self.end
         length = np.sqrt(np.dot(r, r))
         rhat = r / length
-        dist = -self.current_speed * (np.imag(self.i * np.exp(self.w * time * 1j) / self.w) if self.w != 0 else np.real(self.i)*time)
+        dist = -self.current_speed * displacement
         start = dist % (1 / self.current_density)
 
         group = VGroup()
@@ -328,52 +577,277 @@ class Current(CircuitMobject):
         self.become(group)
 
 
+'''
+    A VDict keyed by unordered node pairs: every key is stored as (min, max), so 
+    (i, j) and (j, i) name the same element and a lookup is a single probe.
+'''
 class SymmetricVDict(VDict):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    @staticmethod
+    def canonical(key):
+        i, j = key
+        return (i, j) if i <= j else (j, i)
+
+    def add_key_value_pair(self, key, value):
+        super().add_key_value_pair(self.canonical(key), value)
+
+    def remove(self, key):
+        return super().remove(self.canonical(key))
+
     def __getitem__(self, key):
-        return self.submob_dict.get(key, self.submob_dict[(key[1], key[0])])
+        return self.submob_dict[self.canonical(key)]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(self.canonical(key), value)
 
+    def __delitem__(self, key):
+        super().__delitem__(self.canonical(key))
 
+    def __contains__(self, key):
+        return self.canonical(key) in self.submob_dict
+
+    '''
+        Returns a VGroup of the mobjects of the node pairs keys.
+    '''
+    def get_group(self, keys):
+        return VGroup(*[self[key] for key in keys])
+
+
+'''
+    The mobjects of a theoretical.ACCircuit, animated by a shared timer. 
+
+    With a camera, the elements are LODElements whose level of detail follows the 
+    camera's zoom every frame: elements shorter than detail_threshold pixels are
+    drawn as lines, and labels and current dots are skipped once sub-pixel.
+
+    With merge_static, get_circuit_mobjects returns the elements merged into one
+    StaticPaths, drawn with one stroke per style (or voltage color) instead of one per
+    submobject. The element mobjects are still built, and available through 
+    get_element_mobjects, but not drawn.
+'''
 class ACCircuit:
-    def __init__(self, circuit: tl.ACCircuit, mob_kwargs, do_colored_voltage=False, *args, **kwargs):
+    def __init__(self, circuit: tl.ACCircuit, mob_kwargs, do_colored_voltage=False, camera=None, detail_threshold=DETAIL_THRESHOLD, merge_static=False, *args, **kwargs):
         if mob_kwargs is None:
             mob_kwargs = {}
+        if merge_static and camera is not None:
+            raise ValueError("merge_static and camera (level of detail) cannot be combined")
+        self.camera = camera
+        self.detail_threshold = detail_threshold
+        self._pixels_per_unit = None
+        self._show_dots = True
 
         self.coords = circuit.coords
         self.current_speed = circuit.current_speed
         self.current_density = circuit.current_density
+        self._load_circuit(circuit)
+        self._evaluated_time = None
+        self._evaluated = None
         
         self._timer = ValueTracker(0)
         
         self._elems = SymmetricVDict()
         self._currents = SymmetricVDict()
-
-        for i in range(circuit.nodes - 1):
-            for j in range(i+1, circuit.nodes):
-                celem = circuit[i, j]
-                if celem is None:
-                    continue
-                mobject = celem.get_mobject(
-                    base_v=circuit.get_voltage(celem.tail),
-                    diff_v=celem.get_voltage(head=celem.head),
-                    w=celem.w,
-                    do_colored_voltage=do_colored_voltage,
-                    **mob_kwargs.get(
-                    (i, j), mob_kwargs.get((j, i), {})
-                ))
-                mobject.add_updater(lambda m: m.set_time(self._timer.get_value()))
-                current = celem.get_current_mobject(0, self.current_speed, self.current_density)
-                current.add_updater(lambda c: c.set_time(self._timer.get_value()))
-                self._elems.add({(i, j): mobject})
-                self._currents.add({(i, j): current})
+        self._elem_list = []
+        self._current_list = []
+        self._heads = []
+        self._tails = []
+        self._ids = circuit.get_element_ids()
+
+        for k, celem in enumerate(circuit.get_elements()):
+            i, j = sorted((celem.head, celem.tail))
+            base_v = self._node_phasors[celem.tail]
+            make_detailed = lambda celem=celem, base_v=base_v, i=i, j=j: celem.get_mobject(
+                base_v=base_v,
+                diff_v=self._node_phasors[celem.head] - base_v,
+                w=self.w,
+                do_colored_voltage=do_colored_voltage,
+                **mob_kwargs.get(
+                (i, j), mob_kwargs.get((j, i), {})
+            ))
+            if camera is None:
+                mobject = make_detailed()
+            else:
+                mobject = LODElement(self.coords[celem.head], self.coords[celem.tail], make_detailed, do_colored_voltage)
+            current = Current(
+                start=self.coords[celem.head],
+                end=self.coords[celem.tail],
+                i=self._branch_currents[k],
+                w=self.w,
+                time=0,
+                current_speed=self.current_speed,
+                current_density=self.current_density
+            )
+            self._elems.add({(i, j): mobject})
+            self._currents.add({(i, j): current})
+            self._elem_list.append(mobject)
+            self._current_list.append(current)
+            self._heads.append(celem.head)
+            self._tails.append(celem.tail)
+
+        if camera is not None:
+            coords = np.asarray(self.coords)
+            r = coords[self._heads] - coords[self._tails]
+            self._lengths = np.hypot(r[:, 0], r[:, 1])
+            self.update_detail()
+            self._elems.add_updater(lambda m: self.update_detail())
+        self._static = None
+        if merge_static:
+            self._static = StaticPaths(self._elem_list, do_colored_voltage)
+            if do_colored_voltage:
+                self._static.add_updater(lambda m: self.update_elements(self._timer.get_value()))
+        else:
+            self._elems.add_updater(lambda m: self.update_elements(self._timer.get_value()))
+        self._currents.add_updater(lambda m: self.update_currents(self._timer.get_value()))
+
+    '''
+        Loads the phasors of the whole circuit, which are evaluated together once per 
+        frame. Unknown voltages and currents are nan.
+    '''
+    def _load_circuit(self, circuit):
+        self.w = circuit.w
+        self._node_phasors = circuit.get_node_phasors()
+        self._branch_currents = circuit.get_branch_currents()
+
+    '''
+        Returns the instantaneous node voltages and branch displacements at the given
+        time. The circuit is evaluated in one operation and cached for the frame, so 
+        the element and current updaters share a single evaluation.
+    '''
+    def evaluate(self, time):
+        if self._evaluated_time != time:
+            self._evaluated = (
+                tl.phasors_at(self._node_phasors, self.w, time),
+                tl.displacements_at(self._branch_currents, self.w, time)
+            )
+            self._evaluated_time = time
+        return self._evaluated
+
+    def update_elements(self, time):
+        voltages, _ = self.evaluate(time)
+        highs = voltages[self._heads]
+        lows = voltages[self._tails]
+        if self._static is not None:
+            self._static.set_voltages(highs, lows)
+            return
+        for mobject, high, low in zip(self._elem_list, highs, lows):
+            mobject.set_voltages(high, low)
+
+    '''
+        Sets the level of detail of every element for the current zoom of the camera.
+        Only does work when the zoom has changed since the last frame.
+    '''
+    def update_detail(self):
+        scale = pixels_per_unit(self.camera)
+        if scale == self._pixels_per_unit:
+            return
+        self._pixels_per_unit = scale
+        detailed = self._lengths * scale >= self.detail_threshold
+        for mobject, is_detailed in zip(self._elem_list, detailed):
+            if not is_detailed:
+                mobject.set_level("simple")
+                continue
+            label = mobject.get_label()
+            mobject.set_level("detailed", label is None or label.height * scale >= SUBPIXEL)
+        self._show_dots = 2 * DEFAULT_DOT_RADIUS * 0.75 * scale >= SUBPIXEL
+
+    def update_currents(self, time):
+        if not self._show_dots:
+            for current in self._current_list:
+                if current.submobjects:
+                    current.become(VGroup())
+            return
+        _, displacements = self.evaluate(time)
+        for current, displacement in zip(self._current_list, displacements):
+            current.set_displacement(displacement)
         
     def get_timer(self):
         return self._timer
     
     def get_circuit_mobjects(self):
+        if self._static is not None:
+            return self._static
+        return self._elems
+
+    def get_element_mobjects(self):
         return self._elems
+
+    '''
+        Returns the element ids of the node pairs keys, in either order, as an array.
+        Ids index the solver's per-element arrays (theoretical.ACCircuit.get_elements,
+        get_branch_currents, sensitivities) and the arrays below.
+    '''
+    def element_ids(self, keys):
+        return np.array([self._ids[SymmetricVDict.canonical(key)] for key in keys], dtype=int)
+
+    '''
+        Returns a VGroup of the element mobjects of the node pairs keys, or of the 
+        element ids ids.
+    '''
+    def get_element_group(self, keys=None, ids=None):
+        if ids is None:
+            ids = self.element_ids(keys)
+        return VGroup(*[self._elem_list[k] for k in ids])
+
+    def get_current_group(self, keys=None, ids=None):
+        if ids is None:
+            ids = self.element_ids(keys)
+        return VGroup(*[self._current_list[k] for k in ids])
+
+    '''
+        Returns the instantaneous voltages at the heads and tails of the elements of 
+        the node pairs keys (or ids) at time, as two arrays.
+    '''
+    def get_element_voltages(self, time, keys=None, ids=None):
+        if ids is None:
+            ids = self.element_ids(keys)
+        voltages, _ = self.evaluate(time)
+        return voltages[np.asarray(self._heads)[ids]], voltages[np.asarray(self._tails)[ids]]
     
     def get_current_mobjects(self):
         return self._currents
+
+
+
+'''
+    Animates a circuit from precomputed tables instead of steady-state phasors, e.g. a
+    switched RC/RL transient from approx.ApproxCircuit. voltages has shape (frames,
+    nodes) and currents (frames, branches) with branches in the order of 
+    circuit.get_elements(), sampled at t0 + k / fps. The timer is the simulation time.
+
+    Current dots are moved by the cumulative (trapezoidal) integral of each branch 
+    current, computed once here, so no physics is done per frame. Without currents 
+    the dots stay still. The circuit only provides the topology and does not need to 
+    be analyzed.
+'''
+class TransientCircuit(ACCircuit):
+    def __init__(self, circuit: tl.ACCircuit, voltages, currents=None, fps=60, t0=0, mob_kwargs=None, do_colored_voltage=True, *args, **kwargs):
+        self.fps = fps
+        self.t0 = t0
+        self._voltage_table = np.real(np.asarray(voltages))
+        frames = len(self._voltage_table)
+        if currents is None:
+            currents = np.zeros((frames, len(circuit.get_elements())))
+        currents = np.real(np.asarray(currents))
+        self._displacement_table = np.zeros_like(currents)
+        self._displacement_table[1:] = np.cumsum((currents[1:] + currents[:-1]) / 2, axis=0) / fps
+        super().__init__(circuit, mob_kwargs, do_colored_voltage, *args, **kwargs)
+
+    '''
+        Builds a TransientCircuit from an approx.FrameTable.
+    '''
+    @classmethod
+    def from_frame_table(cls, circuit: tl.ACCircuit, table, currents=None, *args, **kwargs):
+        return cls(circuit, table.vs.T, currents, table.fps, table.t0, *args, **kwargs)
+
+    def _load_circuit(self, circuit):
+        # The first frame, as constant phasors for the mobjects' initial colors
+        self.w = 0
+        self._node_phasors = self._voltage_table[0]
+        self._branch_currents = np.zeros(self._displacement_table.shape[1])
+
+    def evaluate(self, time):
+        k = int(round((time - self.t0) * self.fps))
+        k = min(max(k, 0), len(self._voltage_table) - 1)
+        return self._voltage_table[k], self._displacement_table[k]
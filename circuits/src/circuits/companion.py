@@ -0,0 +1,92 @@
+import numpy as np
+from scipy.integrate import DenseOutput, OdeSolver
+from scipy.linalg import lu_factor, lu_solve
+
+'''
+    Fixed step solvers for approx.CompiledCircuit built on companion models: every
+    capacitor and inductor is replaced, over one step h, by a source in parallel
+    with a conductance, which for the state equation dr/dt = A r + e is the
+    theta-method
+
+        (I - h theta A) r' = (I + h (1 - theta) A) r + h e
+
+    The matrix on the left only changes on switch events, so it is LU-factored once
+    per switch configuration and step size, and every step is a pair of triangular
+    solves. A step that would cross a switch event is cut short at the event. Both
+    methods are A-stable, so stiff circuits can take steps as long as the animation
+    needs, whatever their fastest time constant. Trapezoidal is second order but
+    lets modes much faster than the step ring; backward Euler is first order and
+    damps them.
+
+    Use them through the method argument of the solve functions, as "trapezoidal"
+    or "backward_euler", with the step size as step (by default the frame duration
+    with fps, or a thousandth of t_range).
+'''
+class CompanionSolver(OdeSolver):
+    theta = 0.5
+
+    def __init__(self, fun, t0, y0, t_bound, circuit, t_start=None, step=None, vectorized=False, **extraneous):
+        super().__init__(fun, t0, y0, t_bound, vectorized)
+        self.circuit = circuit
+        self.t_start = t0 if t_start is None else t_start
+        if step is None:
+            step = abs(t_bound - t0) / 1000
+        if step <= 0:
+            raise ValueError("step must be positive")
+        self.h = step
+        self.y_old = None
+        self._factors = {}
+
+    def _factor(self, switch_states, A, h):
+        key = (switch_states, h)
+        factor = self._factors.get(key)
+        if factor is None:
+            factor = self._factors[key] = lu_factor(np.identity(self.n) - h * self.theta * A)
+            self.nlu += 1
+        return factor
+
+    def _step_impl(self):
+        t = self.t
+        h = min(self.h, abs(self.t_bound - t)) * self.direction
+        t_new = t + h
+        # Steps end at switch events, so every step has one switch configuration
+        events = self.circuit.event_times(min(t, t_new), max(t, t_new))
+        if len(events) != 0:
+            t_new = events[0] if self.direction > 0 else events[-1]
+            h = t_new - t
+        switch_states = self.circuit.switch_states(self.t_start, t + h / 2)
+        system = self.circuit.system(switch_states)
+        rhs = self.y + h * ((1 - self.theta) * (system.A @ self.y) + system.e)
+        y_new = lu_solve(self._factor(switch_states, system.A, h), rhs)
+
+        self.t_old = t
+        self.y_old = self.y
+        self.t = t_new
+        self.y = y_new
+        return True, None
+
+    def _dense_output_impl(self):
+        return LinearDenseOutput(self.t_old, self.t, self.y_old, self.y)
+
+class TrapezoidalSolver(CompanionSolver):
+    theta = 0.5
+
+class BackwardEulerSolver(CompanionSolver):
+    theta = 1
+
+class LinearDenseOutput(DenseOutput):
+    def __init__(self, t_old, t, y_old, y):
+        super().__init__(t_old, t)
+        self.y_old = y_old
+        self.y = y
+
+    def _call_impl(self, t):
+        x = (t - self.t_old) / (self.t - self.t_old)
+        if np.ndim(t) == 0:
+            return self.y_old + x * (self.y - self.y_old)
+        return self.y_old[:, None] + np.outer(self.y - self.y_old, x)
+
+METHODS = {
+    "trapezoidal": TrapezoidalSolver,
+    "backward_euler": BackwardEulerSolver,
+}
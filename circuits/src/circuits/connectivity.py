@@ -0,0 +1,136 @@
+import numpy as np
+
+'''
+    Disjoint sets over the nodes 0..n-1, with path compression and union by rank, so
+    that any sequence of unions and finds runs in near-linear time. Used by both
+    solvers to find supernodes: nodes joined by voltage sources, wires or closed
+    switches.
+'''
+class UnionFind:
+    def __init__(self, n):
+        self.n = n
+        self._parent = list(range(n))
+        self._rank = [0] * n
+
+    def find(self, x):
+        parent = self._parent
+        while parent[x] != x:
+            # Path halving
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return x
+        if self._rank[x] < self._rank[y]:
+            x, y = y, x
+        self._parent[y] = x
+        if self._rank[x] == self._rank[y]:
+            self._rank[x] += 1
+        return x
+
+    def union_all(self, pairs):
+        for x, y in pairs:
+            self.union(x, y)
+        return self
+
+    '''
+        Returns the component of every node as an array of labels 0..k-1. Components
+        are numbered in the order of their smallest node.
+    '''
+    def labels(self):
+        roots = np.array([self.find(x) for x in range(self.n)], dtype=int)
+        _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+        order = np.empty(len(first), dtype=int)
+        order[np.argsort(first)] = np.arange(len(first))
+        return order[inverse.ravel()]
+
+    '''
+        Returns the nodes of every component, in the order of labels().
+    '''
+    def groups(self):
+        return groups(self.labels())
+
+def groups(labels):
+    order = np.argsort(labels, kind="stable")
+    splits = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, splits)
+
+'''
+    Returns the sparse (components, nodes) membership matrix of labels: row c has a one
+    at every node of component c.
+'''
+def membership(labels):
+    from scipy import sparse
+
+    n = len(labels)
+    return sparse.csr_array((np.ones(n), (labels, np.arange(n))), shape=(labels.max() + 1, n))
+
+'''
+    For a graph of voltage sources over n nodes, with source i from plus[i] to 
+    minus[i], returns the supernode label of every node and the sparse (sources, n)
+    matrix whose row i marks the nodes still connected to plus[i] once source i is
+    removed. The current through source i is the net current leaving those nodes.
+
+    Works on a spanning forest of the sources in linear time (plus the size of the
+    output): the positive side of a tree edge is either the subtree below it or the
+    rest of its supernode. Sources that close a loop get empty rows.
+'''
+def source_cuts(n, plus, minus):
+    from scipy import sparse
+
+    super_nodes = UnionFind(n)
+    adjacency = [[] for _ in range(n)]
+    for source, (p, m) in enumerate(zip(plus, minus)):
+        if super_nodes.find(p) != super_nodes.find(m):
+            super_nodes.union(p, m)
+            adjacency[p].append((m, source))
+            adjacency[m].append((p, source))
+    labels = super_nodes.labels()
+
+    # Depth first order of the forest: the subtree of x is order[first[x]:last[x]]
+    first = np.zeros(n, dtype=int)
+    last = np.zeros(n, dtype=int)
+    child = np.full(len(plus), -1)
+    visited = [False] * n
+    order = []
+    for root in range(n):
+        if visited[root]:
+            continue
+        visited[root] = True
+        first[root] = len(order)
+        order.append(root)
+        stack = [(root, iter(adjacency[root]))]
+        while len(stack) != 0:
+            x, edges = stack[-1]
+            for y, source in edges:
+                if not visited[y]:
+                    visited[y] = True
+                    child[source] = y
+                    first[y] = len(order)
+                    order.append(y)
+                    stack.append((y, iter(adjacency[y])))
+                    break
+            else:
+                last[x] = len(order)
+                stack.pop()
+    order = np.array(order, dtype=int)
+
+    components = groups(labels)
+    rows = []
+    cols = []
+    for source, (p, c) in enumerate(zip(plus, child)):
+        if c < 0:
+            continue
+        side = order[first[c]:last[c]]
+        if p != c:
+            side = np.setdiff1d(components[labels[p]], side, assume_unique=True)
+        rows.append(np.full(len(side), source))
+        cols.append(side)
+    rows = np.concatenate(rows) if len(rows) != 0 else np.zeros(0, dtype=int)
+    cols = np.concatenate(cols) if len(cols) != 0 else np.zeros(0, dtype=int)
+    G = sparse.csr_array((np.ones(len(rows)), (rows, cols)), shape=(len(plus), n))
+    return labels, G
@@ -0,0 +1,74 @@
+import cairo
+from manim import *
+
+MAX_CACHED_GRADIENTS = 4096
+
+_gradient_cache = {}
+
+def _get_gradient(key, rgbas, create):
+    pattern = _gradient_cache.get(key)
+    if pattern is None:
+        if len(_gradient_cache) >= MAX_CACHED_GRADIENTS:
+            _gradient_cache.pop(next(iter(_gradient_cache)))
+        pattern = _gradient_cache[key] = create()
+        offsets = np.linspace(0, 1, len(rgbas))
+        for rgba, offset in zip(rgbas, offsets):
+            # Cairo surfaces store rgb in reverse order
+            pattern.add_color_stop_rgba(offset, *rgba[2::-1], rgba[3])
+    return pattern
+
+def clear_gradient_cache():
+    _gradient_cache.clear()
+
+def set_cairo_context_color(self, ctx, rgbas, vmobject):
+    """Sets the color of the cairo context, with support for radial gradients.
+
+    VMobjects with a truthy ``radial_gradient`` attribute are filled with a radial
+    gradient from their center to their farthest point, others with manim's linear
+    gradient. Gradient patterns are built at the origin and cached by colors and
+    shape, then translated onto the mobject, so a mobject that only moves between
+    frames reuses its pattern.
+
+    Parameters
+    ----------
+    ctx : cairo.Context
+        The cairo context
+    rgbas : np.ndarray
+        The RGBA array with which to color the context.
+    vmobject : VMobject
+        The VMobject with which to set the color.
+
+    Returns
+    -------
+    Camera
+        The camera object
+    """
+    if len(rgbas) == 1:
+        ctx.set_source_rgba(*rgbas[0][2::-1], rgbas[0][3])
+        return self
+
+    rgbas = np.asarray(rgbas)
+    if getattr(vmobject, "radial_gradient", False):
+        center = self.transform_points_pre_display(vmobject, np.array([vmobject.get_center()]))[0]
+        points = self.transform_points_pre_display(vmobject, vmobject.points)
+        radius = np.sqrt(np.max(np.sum((points - center) ** 2, axis=1)))
+        key = ("radial", rgbas.tobytes(), round(radius, 6))
+        pattern = _get_gradient(key, rgbas, lambda: cairo.RadialGradient(0, 0, 0, 0, 0, radius))
+        origin = center[:2]
+    else:
+        start, end = self.transform_points_pre_display(vmobject, vmobject.get_gradient_start_and_end_points())
+        direction = end[:2] - start[:2]
+        key = ("linear", rgbas.tobytes(), tuple(np.round(direction, 6)))
+        pattern = _get_gradient(key, rgbas, lambda: cairo.LinearGradient(0, 0, *direction))
+        origin = start[:2]
+
+    # Maps user space onto the pattern, which was built at the origin
+    pattern.set_matrix(cairo.Matrix(x0=-origin[0], y0=-origin[1]))
+    ctx.set_source(pattern)
+    return self
+
+'''
+    Installs set_cairo_context_color on manim's Camera.
+'''
+def use_gradient_renderer():
+    Camera.set_cairo_context_color = set_cairo_context_color
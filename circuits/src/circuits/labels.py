@@ -0,0 +1,134 @@
+from manim import *
+
+# Glyphs pre-rendered for NumericLabel. The minus sign is braced so that TeX treats
+# it as an ordinary symbol rather than a binary operator.
+NUMERIC_GLYPHS = "0123456789.-"
+NUMERIC_GLYPHS_TEX = "0123456789.{-}"
+
+MAX_CACHED_LABELS = 1024
+
+_label_cache = {}
+
+def _style_key(kwargs):
+    return tuple(sorted((key, repr(value)) for key, value in kwargs.items()))
+
+def _cached(mobject_class, args, kwargs):
+    key = (mobject_class, args, _style_key(kwargs))
+    prototype = _label_cache.get(key)
+    if prototype is None:
+        if len(_label_cache) >= MAX_CACHED_LABELS:
+            _label_cache.pop(next(iter(_label_cache)))
+        prototype = _label_cache[key] = mobject_class(*args, **kwargs)
+    return prototype.copy()
+
+'''
+    Returns a copy of Text(text, **kwargs). Each distinct text and style is only
+    rendered through Pango once.
+'''
+def cached_text(text, **kwargs):
+    return _cached(Text, (text,), kwargs)
+
+'''
+    Returns a copy of MathTex(*tex_strings, **kwargs). Each distinct string and style
+    is only compiled through LaTeX once.
+'''
+def cached_tex(*tex_strings, **kwargs):
+    return _cached(MathTex, tex_strings, kwargs)
+
+def clear_label_cache():
+    _label_cache.clear()
+
+
+'''
+    A number with an optional prefix and suffix (e.g. "PE=", "J") that can be changed
+    every frame without rendering any text. The prefix, the glyphs 0-9 . - and the
+    suffix are rendered once, together so that they share a baseline, and set_value
+    only swaps the glyphs of the characters that changed.
+
+    Style keyword arguments are passed to MathTex (tex=True) or Text. The label can
+    be moved and scaled freely between calls to set_value.
+'''
+class NumericLabel(VGroup):
+    def __init__(self, value=0, num_decimal_places=1, prefix="", suffix="", tex=True, edge_to_fix=LEFT, **kwargs):
+        super().__init__()
+        self.num_decimal_places = num_decimal_places
+        self.edge_to_fix = edge_to_fix
+
+        if tex:
+            strings = [string for string in (prefix, NUMERIC_GLYPHS_TEX, suffix) if string]
+            atlas = cached_tex(*strings, **kwargs)
+            parts = [sorted(part, key=lambda g: g.get_left()[0]) for part in atlas]
+            prefix_glyphs = parts[0] if prefix else []
+            glyphs = parts[1 if prefix else 0]
+            suffix_glyphs = parts[-1] if suffix else []
+        else:
+            atlas = cached_text(prefix + NUMERIC_GLYPHS + suffix, disable_ligatures=True, **kwargs)
+            n_prefix = len("".join(prefix.split()))
+            n_glyphs = len(NUMERIC_GLYPHS)
+            prefix_glyphs = atlas[:n_prefix]
+            glyphs = atlas[n_prefix:n_prefix + n_glyphs]
+            suffix_glyphs = atlas[n_prefix + n_glyphs:]
+
+        # Atlas coordinates of every glyph, used to place copies in the label's frame
+        self._atlas = dict(zip(NUMERIC_GLYPHS, glyphs))
+        self._buff = np.median([b.get_left()[0] - a.get_right()[0] for a, b in zip(glyphs[:-1], glyphs[1:])])
+        self._start = prefix_glyphs[-1].get_right()[0] + self._buff if len(prefix_glyphs) else glyphs[0].get_left()[0]
+
+        self._prefix = VGroup(*prefix_glyphs)
+        self._digits = VGroup()
+        self._suffix = VGroup(*suffix_glyphs)
+        self._suffix_x = self._suffix.get_left()[0] if len(suffix_glyphs) else 0
+        self._chars = ""
+        self._offsets = []
+        self.add(self._prefix, self._digits, self._suffix)
+        self.set_value(value)
+
+    def _get_frame(self):
+        # The label's translation and scale relative to atlas coordinates
+        if len(self._chars) == 0:
+            return ORIGIN, 1
+        slot = self._digits[0]
+        glyph = self._atlas[self._chars[0]]
+        scale = slot.width / glyph.width if glyph.width != 0 else 1
+        atlas_corner = glyph.get_corner(DL) + self._offsets[0] * RIGHT
+        return slot.get_corner(DL) - scale * atlas_corner, scale
+
+    def get_value(self):
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+        string = f"{value:.{self.num_decimal_places}f}"
+        if string == self._chars:
+            return self
+
+        fixed = self.get_critical_point(self.edge_to_fix)[0] if len(self._chars) else None
+        origin, scale = self._get_frame()
+
+        slots = self._digits.submobjects
+        offsets = []
+        cursor = self._start
+        for k, char in enumerate(string):
+            glyph = self._atlas[char]
+            offset = cursor - glyph.get_left()[0]
+            if k < len(self._chars) and self._chars[k] == char:
+                slots[k].shift(scale * (offset - self._offsets[k]) * RIGHT)
+            else:
+                slot = glyph.copy().shift(offset * RIGHT).scale(scale, about_point=ORIGIN).shift(origin)
+                if k < len(slots):
+                    slots[k] = slot
+                else:
+                    slots.append(slot)
+            offsets.append(offset)
+            cursor += glyph.width + self._buff
+        del slots[len(string):]
+
+        if len(self._suffix) != 0:
+            self._suffix.shift(scale * (cursor - self._suffix_x) * RIGHT)
+            self._suffix_x = cursor
+
+        self._chars = string
+        self._offsets = offsets
+        if fixed is not None:
+            self.shift((fixed - self.get_critical_point(self.edge_to_fix)[0]) * RIGHT)
+        return self
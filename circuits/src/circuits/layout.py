@@ -0,0 +1,155 @@
+from collections import OrderedDict
+
+import numpy as np
+
+'''
+    Automatic schematic layout: node coordinates for ACCircuit.get_mobjects when the
+    circuit has no hand-written ones, e.g. for generated circuits.
+
+    The nodes are placed by a force-directed (Fruchterman-Reingold) simulation in
+    which edges pull their nodes together and nearby nodes push apart. Repulsion is
+    only computed between nodes in neighbouring cells of a spatial hash, so every
+    iteration is a handful of vectorized NumPy passes over the nodes and the close
+    pairs instead of all n^2 pairs. The result is fitted to the frame and snapped to
+    a grid, so elements line up along the grid where they can, and nodes that snap
+    to the same point are moved to the nearest free one.
+
+    Layouts are cached by topology, so circuits with the same nodes and connections
+    share one layout.
+'''
+
+CACHE_SIZE = 128
+_cache = OrderedDict()
+
+'''
+    Returns the (pairs, 2) array of the nodes i < j in the same or neighbouring cells
+    of a hash of pos with cells of size cell.
+'''
+def _close_pairs(pos, cell):
+    keys = np.floor(pos / cell).astype(np.int64)
+    keys -= keys.min(axis=0) - 1
+    width = keys[:, 1].max() + 2
+    hashes = keys[:, 0] * width + keys[:, 1]
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+
+    pairs = []
+    # Half of the neighbourhood, so that every pair of cells is visited once
+    for dx, dy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        target = hashes + dx * width + dy
+        starts = np.searchsorted(sorted_hashes, target, side="left")
+        counts = np.searchsorted(sorted_hashes, target, side="right") - starts
+        i = np.repeat(np.arange(len(pos)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(starts, counts) + offsets]
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        pairs.append(np.stack((i, j), axis=1))
+    return np.concatenate(pairs)
+
+def _accumulate(nodes, index, values):
+    return np.stack([np.bincount(index, values[:, k], minlength=nodes) for k in range(2)], axis=1)
+
+'''
+    Runs the force-directed simulation on nodes with edges (an (edges, 2) array) and
+    returns the (nodes, 2) positions, with an ideal edge length of 1.
+'''
+def force_directed(nodes, edges, iterations=100, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    size = np.sqrt(nodes)
+    pos = rng.uniform(0, size, (nodes, 2))
+    temperature = size / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        # Repulsion k^2 / d between nodes closer than 2k, with k = 1
+        pairs = _close_pairs(pos, 2)
+        i, j = pairs.T
+        delta = pos[i] - pos[j]
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-3)
+        push = np.where(distance < 2, 1 / distance ** 2, 0)[:, None] * delta
+        force = _accumulate(nodes, i, push) - _accumulate(nodes, j, push)
+
+        # Attraction d^2 / k along edges
+        i, j = edges.T
+        delta = pos[i] - pos[j]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        pull = distance[:, None] * delta
+        force += _accumulate(nodes, j, pull) - _accumulate(nodes, i, pull)
+
+        length = np.maximum(np.hypot(force[:, 0], force[:, 1]), 1e-9)
+        pos += force / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature -= cooling
+    return pos
+
+'''
+    Snaps pos to the points of a grid with the given spacing. Nodes that land on a
+    taken point are moved to the closest free one around it: the offsets around a
+    point are tried in order of distance, each for all the nodes left at once.
+'''
+def snap(pos, spacing):
+    base = np.rint(pos / spacing).astype(np.int64)
+    # A square of side sqrt(n) around any point has room for every node
+    pad = int(np.ceil(np.sqrt(len(pos)))) + 1
+    base -= base.min(axis=0) - pad
+    occupied = np.zeros(base.max(axis=0) + pad + 1, dtype=bool)
+    points = base.copy()
+    placed = np.zeros(len(pos), dtype=bool)
+    radius = 0
+    while not placed.all():
+        offsets = np.array([
+            (dx, dy)
+            for dx in range(-radius, radius + 1)
+            for dy in range(-radius, radius + 1)
+            if max(abs(dx), abs(dy)) == radius
+        ])
+        offsets = offsets[np.argsort(np.hypot(offsets[:, 0], offsets[:, 1]), kind="stable")]
+        for offset in offsets:
+            left = np.flatnonzero(~placed)
+            if len(left) == 0:
+                break
+            candidates = base[left] + offset
+            free = ~occupied[candidates[:, 0], candidates[:, 1]]
+            # One node per free point
+            _, first = np.unique(candidates[free], axis=0, return_index=True)
+            chosen = left[free][first]
+            points[chosen] = base[chosen] + offset
+            placed[chosen] = True
+            occupied[points[chosen, 0], points[chosen, 1]] = True
+        radius += 1
+    return (points - (base - np.rint(pos / spacing).astype(np.int64))) * spacing
+
+'''
+    Returns (nodes, 3) coordinates for a circuit of nodes with edges (pairs of
+    nodes), centred on the origin inside a width by height frame and snapped to a
+    grid of the given spacing. The spacing is reduced when the frame doesn't have
+    room for the nodes.
+'''
+def layout(nodes, edges, width=12, height=7, spacing=1, iterations=100, seed=0):
+    edges = tuple(sorted({(min(a, b), max(a, b)) for a, b in edges}))
+    key = (nodes, edges, width, height, spacing, iterations, seed)
+    coords = _cache.get(key)
+    if coords is not None:
+        _cache.move_to_end(key)
+        return coords.copy()
+
+    spacing = min(spacing, np.sqrt(width * height / (2 * nodes)))
+    pos = force_directed(nodes, edges, iterations, seed)
+    low = pos.min(axis=0)
+    extent = pos.max(axis=0) - low
+    frame = np.array([width, height]) - spacing
+    scale = np.min(np.divide(frame, extent, out=np.full(2, np.inf), where=extent > 0))
+    if np.isinf(scale):
+        scale = 1
+    pos = (pos - low - extent / 2) * scale
+
+    coords = np.zeros((nodes, 3))
+    coords[:, :2] = snap(pos, spacing)
+    _cache[key] = coords
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return coords.copy()
+
+def clear_cache():
+    _cache.clear()
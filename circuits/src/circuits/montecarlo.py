@@ -0,0 +1,366 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import theoretical as tl
+from .approx import ApproxCircuit
+
+'''
+    Value attribute and tolerance kind of every element type of theoretical.
+    Tolerances are given per kind ("R", "C", "L", "V", "I", "K" for gains) or per
+    element.
+'''
+ELEMENT_VALUES = {
+    tl.Resistor: ("_resistance", "R"),
+    tl.Capacitor: ("_capacitance", "C"),
+    tl.Inductor: ("_inductance", "L"),
+    tl.IndependantVoltage: ("_voltage", "V"),
+    tl.IndependantCurrent: ("_current", "I"),
+    tl.DependantVoltage: ("a", "K"),
+    tl.DependantCurrent: ("g", "K"),
+    tl.CurrentControlledCurrent: ("a", "K"),
+    tl.CurrentControlledVoltage: ("r", "K"),
+}
+
+'''
+    Returns n draws of values around nominal, with relative tolerances tolerance, as
+    an array of shape (n, len(nominal)). For "normal" the tolerance is three
+    standard deviations, for "uniform" the half width.
+'''
+def draw(rng, nominal, tolerance, n, distribution="normal"):
+    nominal = np.asarray(nominal)
+    tolerance = np.asarray(tolerance, dtype=float)
+    if distribution == "normal":
+        deviation = tolerance / 3 * rng.standard_normal((n, len(nominal)))
+    elif distribution == "uniform":
+        deviation = tolerance * rng.uniform(-1, 1, (n, len(nominal)))
+    else:
+        raise ValueError(f"Unknown distribution {distribution!r}")
+    return nominal * (1 + deviation)
+
+'''
+    Summary statistics of a stream of samples of shape (n, outputs), updated chunk
+    by chunk without keeping the samples: count, mean, std, min, max and a
+    histogram per output, from which percentiles are interpolated. Unless given a
+    range, the histogram edges are fixed from the first chunk, widened by margin on
+    each side; later samples outside them are counted in underflow and overflow.
+'''
+class StreamingStats:
+    def __init__(self, bins=64, range=None, margin=0.25):
+        self.bins = bins
+        self.range = range
+        self.margin = margin
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+        self.min = None
+        self.max = None
+        self.edges = None
+        self.histogram = None
+        self.underflow = None
+        self.overflow = None
+
+    def _init_histogram(self, samples):
+        if self.range is not None:
+            low = np.broadcast_to(np.asarray(self.range[0], dtype=float), samples.shape[1:])
+            high = np.broadcast_to(np.asarray(self.range[1], dtype=float), samples.shape[1:])
+        else:
+            low = samples.min(axis=0)
+            high = samples.max(axis=0)
+            width = np.where(high > low, high - low, np.maximum(np.abs(high), 1))
+            low = low - self.margin * width
+            high = high + self.margin * width
+        self.edges = np.linspace(low, high, self.bins + 1, axis=-1)
+        self.histogram = np.zeros(samples.shape[1:] + (self.bins,), dtype=np.int64)
+        self.underflow = np.zeros(samples.shape[1:], dtype=np.int64)
+        self.overflow = np.zeros(samples.shape[1:], dtype=np.int64)
+
+    def update(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        n = len(samples)
+        if n == 0:
+            return self
+        if self.edges is None:
+            self._init_histogram(samples)
+
+        # Chan et al.'s pairwise update of the mean and sum of squared deviations
+        mean = samples.mean(axis=0)
+        m2 = ((samples - mean) ** 2).sum(axis=0)
+        if self.count == 0:
+            self.mean, self._m2 = mean, m2
+            self.min, self.max = samples.min(axis=0), samples.max(axis=0)
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean = self.mean + delta * n / total
+            self._m2 = self._m2 + m2 + delta ** 2 * self.count * n / total
+            self.min = np.minimum(self.min, samples.min(axis=0))
+            self.max = np.maximum(self.max, samples.max(axis=0))
+        self.count += n
+
+        low = self.edges[..., 0]
+        high = self.edges[..., -1]
+        self.underflow += (samples < low).sum(axis=0)
+        self.overflow += (samples > high).sum(axis=0)
+        index = np.floor((samples - low) / (high - low) * self.bins).astype(int)
+        inside = (samples >= low) & (samples <= high)
+        index = np.clip(index, 0, self.bins - 1)
+        for k in np.ndindex(samples.shape[1:]):
+            column = (slice(None),) + k
+            self.histogram[k] += np.bincount(index[column][inside[column]], minlength=self.bins)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self._m2 / max(self.count - 1, 1))
+
+    '''
+        Returns the q-th percentiles (0-100) of every output, interpolated linearly
+        within the histogram bins, with shape (*q, outputs).
+    '''
+    def percentile(self, q):
+        q = np.asarray(q, dtype=float)
+        cumulative = np.concatenate((self.underflow[..., None], self.histogram), axis=-1).cumsum(axis=-1)
+        target = q[..., None] / 100 * self.count
+        result = np.empty(q.shape + self.histogram.shape[:-1])
+        for k in np.ndindex(self.histogram.shape[:-1]):
+            # cumulative[k][j] is the count up to edges[k][j]
+            result[(...,) + k] = np.interp(target[..., 0], cumulative[k], self.edges[k])
+        return result
+
+'''
+    A theoretical.ACCircuit compiled to a plan of plain tuples over the
+    wire-collapsed nodes, so that chunks of parameter draws are assembled as one
+    stack of MNA matrices and solved together by np.linalg.solve. Only the values
+    change between draws, never the topology.
+'''
+class ACModel:
+    def __init__(self, circuit, tolerances):
+        labels, nodes = circuit.collapse_wires()
+        self.labels = labels
+        self.nodes = nodes
+        self.ground = labels[circuit.ground]
+        self.w = circuit.w
+        self.elements = circuit.get_elements()
+
+        index = {id(elem): k for k, elem in enumerate(self.elements)}
+        nominal = []
+        tolerance = []
+        self.plan = []
+        branches = 0
+        for elem in self.elements:
+            if isinstance(elem, tl.Wire):
+                self.plan.append(("wire",))
+                continue
+            if type(elem) not in ELEMENT_VALUES:
+                raise ValueError(f"Cannot sample element {elem}")
+            attribute, kind = ELEMENT_VALUES[type(elem)]
+            k = len(nominal)
+            nominal.append(getattr(elem, attribute))
+            tolerance.append(tolerances.get(elem, tolerances.get(kind, 0)))
+            head, tail = labels[elem.head], labels[elem.tail]
+            if isinstance(elem, (tl.Resistor, tl.Capacitor)) or (isinstance(elem, tl.Inductor) and self.w != 0):
+                self.plan.append(("admittance", head, tail, k, type(elem).__name__))
+            elif isinstance(elem, tl.IndependantCurrent):
+                self.plan.append(("current", head, tail, k))
+            elif isinstance(elem, tl.DependantCurrent):
+                self.plan.append(("vccs", head, tail, k, labels[elem.dplus], labels[elem.dminus]))
+            elif isinstance(elem, tl.CurrentControlledCurrent):
+                self.plan.append(("cccs", head, tail, k, index[id(elem.control)]))
+            else:
+                # Voltage defined: sources, CCVS, and inductors at w=0, which are shorts
+                branch = nodes + branches
+                branches += 1
+                if isinstance(elem, tl.Inductor):
+                    self.plan.append(("short", head, tail, branch))
+                elif isinstance(elem, tl.IndependantVoltage):
+                    self.plan.append(("voltage", head, tail, branch, k))
+                elif isinstance(elem, tl.DependantVoltage):
+                    self.plan.append(("vcvs", head, tail, branch, k, labels[elem.dplus], labels[elem.dminus]))
+                else:
+                    self.plan.append(("ccvs", head, tail, branch, k, index[id(elem.control)]))
+        self.size = nodes + branches
+        self.nominal = np.array(nominal)
+        self.tolerance = np.array(tolerance, dtype=float)
+
+    def _admittance(self, name, value):
+        if name == "Resistor":
+            return 1 / value
+        if name == "Capacitor":
+            return 1j * self.w * value
+        return 1 / (1j * self.w * value)
+
+    '''
+        Returns the current through element k from head to tail for the draws
+        values, as ([(column, coefficients)], constants).
+    '''
+    def _current(self, k, values):
+        step = self.plan[k]
+        kind = step[0]
+        if kind == "admittance":
+            _, head, tail, p, name = step
+            y = self._admittance(name, values[:, p])
+            return [(head, y), (tail, -y)], 0
+        if kind == "current":
+            return [], values[:, step[3]]
+        if kind == "vccs":
+            _, head, tail, p, dplus, dminus = step
+            return [(dplus, values[:, p]), (dminus, -values[:, p])], 0
+        if kind == "cccs":
+            _, head, tail, p, control = step
+            terms, constant = self._current(control, values)
+            a = values[:, p]
+            return [(column, a * coefficient) for column, coefficient in terms], a * constant
+        if kind == "wire":
+            raise ValueError("Controlled sources cannot be controlled by a wire")
+        return [(step[3], 1)], 0
+
+    '''
+        Returns the node voltage phasors of every draw, with shape (draws, nodes of
+        the circuit).
+    '''
+    def solve(self, values):
+        n = len(values)
+        matrix = np.zeros((n, self.size, self.size), dtype=np.complex128)
+        rhs = np.zeros((n, self.size), dtype=np.complex128)
+
+        def add(row, column, coefficient):
+            if row != self.ground:
+                matrix[:, row, column] += coefficient
+
+        def add_rhs(row, coefficient):
+            if row != self.ground:
+                rhs[:, row] += coefficient
+
+        for k, step in enumerate(self.plan):
+            kind = step[0]
+            if kind == "wire":
+                continue
+            head, tail = step[1], step[2]
+            if kind in ("admittance", "current", "vccs", "cccs"):
+                terms, constant = self._current(k, values)
+                for column, coefficient in terms:
+                    add(head, column, coefficient)
+                    add(tail, column, -coefficient)
+                add_rhs(head, -constant)
+                add_rhs(tail, constant)
+                continue
+
+            branch = step[3]
+            add(head, branch, 1)
+            add(tail, branch, -1)
+            add(branch, head, 1)
+            add(branch, tail, -1)
+            if kind == "voltage":
+                add_rhs(branch, values[:, step[4]])
+            elif kind == "vcvs":
+                _, _, _, _, p, dplus, dminus = step
+                add(branch, dplus, -values[:, p])
+                add(branch, dminus, values[:, p])
+            elif kind == "ccvs":
+                _, _, _, _, p, control = step
+                terms, constant = self._current(control, values)
+                for column, coefficient in terms:
+                    add(branch, column, -values[:, p] * coefficient)
+                add_rhs(branch, values[:, p] * constant)
+        matrix[:, self.ground, self.ground] = 1
+
+        solution = np.linalg.solve(matrix, rhs[..., None])[..., 0]
+        return solution[:, self.labels]
+
+'''
+    An approx.ApproxCircuit whose resistors, capacitors and inductors are sampled.
+    Every draw is compiled and integrated on its own over the same time grid, so
+    this backend gains from the process pool rather than from batching.
+'''
+class TransientModel:
+    def __init__(self, circuit, tolerances, t_range, fps=None, t_eval=None, **options):
+        self.circuit = circuit
+        self.t_range = t_range
+        self.fps = fps
+        self.t_eval = t_eval
+        self.options = options
+        self.resistors = np.argwhere(np.triu(circuit.Y) != 0)
+        nominal = np.concatenate((circuit.Y[tuple(self.resistors.T)], circuit.C, circuit.L))
+        kinds = ["R"] * len(self.resistors) + ["C"] * len(circuit.C) + ["L"] * len(circuit.L)
+        self.nominal = nominal
+        self.tolerance = np.array([tolerances.get(kind, 0) for kind in kinds], dtype=float)
+
+    '''
+        Returns ts, rs, vs of every draw, each stacked along a first axis of draws.
+    '''
+    def solve(self, values):
+        R = len(self.resistors)
+        C = len(self.circuit.C)
+        results = []
+        for draw_values in values:
+            circuit = copy.copy(self.circuit)
+            circuit.Y = self.circuit.Y.copy()
+            i, j = self.resistors.T
+            circuit.Y[i, j] = circuit.Y[j, i] = draw_values[:R]
+            circuit.C = list(draw_values[R:R + C])
+            circuit.L = list(draw_values[R + C:])
+            results.append(circuit.compile().solve(self.t_range, t_eval=self.t_eval, fps=self.fps, **self.options))
+        return tuple(np.array(result) for result in zip(*results))
+
+def _node_magnitudes(voltages):
+    return np.abs(voltages)
+
+def _final_voltages(ts, rs, vs):
+    return vs[:, :, -1]
+
+def _run_chunk(task):
+    model, seed, n, distribution, output = task
+    rng = np.random.default_rng(seed)
+    values = draw(rng, model.nominal, model.tolerance, n, distribution)
+    result = model.solve(values)
+    return output(*result) if isinstance(result, tuple) else output(result)
+
+'''
+    Monte Carlo tolerance analysis. The circuit (a theoretical.ACCircuit, or an
+    approx.ApproxCircuit with t_range and fps or t_eval for a transient) is compiled
+    once; draws of its element values are generated and solved in chunks of
+    chunk_size, in a process pool with workers, and reduced by output to one row of
+    scalars per draw, which are folded into StreamingStats.
+
+    tolerances maps kinds ("R", "C", "L", "V", "I", "K") or theoretical elements to
+    relative tolerances. output receives the node voltage phasors (draws, nodes) of
+    an ACCircuit, or ts, rs, vs stacked over draws for a transient. It must be a
+    module level function when using workers. By default it is the node voltage
+    magnitudes, or the final node voltages of a transient.
+'''
+class MonteCarlo:
+    def __init__(self, circuit, tolerances, distribution="normal", seed=None, **transient):
+        if isinstance(circuit, ApproxCircuit):
+            self.model = TransientModel(circuit, tolerances, **transient)
+            self.default_output = _final_voltages
+        else:
+            self.model = ACModel(circuit, tolerances)
+            self.default_output = _node_magnitudes
+        self.distribution = distribution
+        self.seed = np.random.SeedSequence(seed)
+
+    def _tasks(self, draws, chunk_size, output):
+        chunks = [chunk_size] * (draws // chunk_size)
+        if draws % chunk_size != 0:
+            chunks.append(draws % chunk_size)
+        seeds = self.seed.spawn(len(chunks))
+        for seed, n in zip(seeds, chunks):
+            yield self.model, seed, n, self.distribution, output
+
+    def run(self, draws, output=None, chunk_size=1024, workers=None, bins=64, range=None):
+        if output is None:
+            output = self.default_output
+        stats = StreamingStats(bins, range)
+        tasks = self._tasks(draws, chunk_size, output)
+        if workers is None:
+            for task in tasks:
+                stats.update(_run_chunk(task))
+            return stats
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(_run_chunk, tasks):
+                stats.update(result)
+        return stats
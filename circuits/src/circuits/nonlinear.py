@@ -0,0 +1,380 @@
+import numpy as np
+
+from .approx import FrameTable, frame_times
+
+# Thermal voltage at room temperature
+VT = 0.025852
+# Conductance across every junction and channel, so that off devices never leave a
+# node floating
+GMIN = 1e-12
+# Junction voltages (in units of n VT) above which the exponential is continued
+# linearly, so that Newton never overflows
+MAX_EXPONENT = 40
+
+'''
+    Returns the current and conductance of pn junctions with saturation current Is
+    and emission coefficient times thermal voltage nvt, at voltages v.
+'''
+def _junction(v, Is, nvt):
+    v_max = MAX_EXPONENT * nvt
+    exp = np.exp(np.minimum(v, v_max) / nvt)
+    g = Is * exp / nvt
+    i = Is * (exp - 1) + g * np.maximum(v - v_max, 0)
+    return i + GMIN * v, g + GMIN
+
+'''
+    A circuit with nonlinear devices (diodes, BJTs, MOSFETs), solved by modified
+    nodal analysis: the unknowns are the node voltages, then the currents through
+    voltage sources and inductors. Linear elements are stamped once into a sparse
+    matrix. Devices are evaluated together, one numpy expression per device type,
+    and Newton-Raphson solves the nonlinear system.
+
+    The sparse LU of the Jacobian is reused across iterations and time steps as long
+    as Newton keeps contracting (modified Newton), and refactored only when it
+    stalls, so a transient of a mostly settled circuit costs little more than one
+    triangular solve per step.
+
+    Transients use backward Euler companion models: over a step h a capacitor is a
+    conductance C / h with a history current source, and an inductor a resistance
+    L / h with a history voltage. At the DC operating point capacitors are open and
+    inductors are shorts.
+
+    Source values may be numbers or functions of time.
+'''
+class NonlinearCircuit:
+    def __init__(self, nodes, ground=0, max_iterations=100, abstol=1e-9, vntol=1e-6, reltol=1e-6):
+        self.nodes = nodes
+        self.ground = ground
+        self.max_iterations = max_iterations
+        self.abstol = abstol
+        self.vntol = vntol
+        self.reltol = reltol
+
+        self.resistors = []
+        self.voltage_sources = []
+        self.current_sources = []
+        self.capacitors = []
+        self.inductors = []
+        self.diodes = []
+        self.bjts = []
+        self.mosfets = []
+
+        self._compiled = None
+        self._factor = None
+
+    def _changed(self):
+        self._compiled = None
+        self._factor = None
+
+    def add_resistor(self, r, i, j):
+        self.resistors.append((i, j, r))
+        self._changed()
+
+    def add_voltage_source(self, v, i, j):
+        self.voltage_sources.append((i, j, v))
+        self._changed()
+
+    '''
+        Pushes ii into node i, out of node j.
+    '''
+    def add_current_source(self, ii, i, j):
+        self.current_sources.append((i, j, ii))
+        self._changed()
+
+    def add_capacitor(self, c, i, j):
+        self.capacitors.append((i, j, c))
+        self._changed()
+
+    def add_inductor(self, l, i, j):
+        self.inductors.append((i, j, l))
+        self._changed()
+
+    '''
+        Adds a diode from anode a to cathode k (Shockley model).
+    '''
+    def add_diode(self, a, k, Is=1e-14, n=1):
+        self.diodes.append((a, k, Is, n * VT))
+        self._changed()
+
+    '''
+        Adds a BJT with collector c, base b and emitter e (Ebers-Moll transport
+        model).
+    '''
+    def add_bjt(self, c, b, e, pnp=False, Is=1e-14, beta_f=100, beta_r=1):
+        self.bjts.append((c, b, e, -1 if pnp else 1, Is, beta_f, beta_r))
+        self._changed()
+
+    '''
+        Adds a MOSFET with drain d, gate g and source s (square law model, with
+        channel length modulation lambda_). Drain and source are interchangeable.
+    '''
+    def add_mosfet(self, d, g, s, pmos=False, k=1e-3, vth=1, lambda_=0):
+        self.mosfets.append((d, g, s, -1 if pmos else 1, k, vth, lambda_))
+        self._changed()
+
+    def _compile(self):
+        if self._compiled is not None:
+            return self._compiled
+
+        def columns(elements, count, dtypes):
+            values = list(zip(*elements)) if len(elements) != 0 else [()] * count
+            return [np.array(value, dtype=dtype) for value, dtype in zip(values, dtypes)]
+
+        n = self.nodes
+        V = len(self.voltage_sources)
+        L = len(self.inductors)
+        compiled = {"size": n + V + L}
+        compiled["resistors"] = columns(self.resistors, 3, (int, int, float))
+        compiled["capacitors"] = columns(self.capacitors, 3, (int, int, float))
+        compiled["inductors"] = columns(self.inductors, 3, (int, int, float))
+        compiled["diodes"] = columns(self.diodes, 4, (int, int, float, float))
+        compiled["bjts"] = columns(self.bjts, 7, (int, int, int, float, float, float, float))
+        compiled["mosfets"] = columns(self.mosfets, 7, (int, int, int, float, float, float, float))
+        vs_nodes = columns([source[:2] for source in self.voltage_sources], 2, (int, int))
+        cs_nodes = columns([source[:2] for source in self.current_sources], 2, (int, int))
+        compiled["voltage_sources"] = vs_nodes
+        compiled["current_sources"] = cs_nodes
+        self._compiled = compiled
+        return compiled
+
+    '''
+        Returns the (rows, cols, values) of the linear elements: resistors, voltage
+        sources, and capacitors and inductors as companion models of step h (or as
+        open and short circuits for h=None).
+    '''
+    def _linear_stamps(self, h):
+        compiled = self._compile()
+        n = self.nodes
+        V = len(self.voltage_sources)
+        rows, cols, values = [], [], []
+
+        def conductance(i, j, g):
+            rows.extend((i, j, i, j))
+            cols.extend((i, j, j, i))
+            values.extend((g, g, -g, -g))
+
+        def branch(i, j, branches):
+            # KCL of the branch current and its voltage equation
+            rows.extend((i, j, branches, branches))
+            cols.extend((branches, branches, i, j))
+            values.extend([np.ones(len(i)), -np.ones(len(i)), np.ones(len(i)), -np.ones(len(i))])
+
+        i, j, r = compiled["resistors"]
+        conductance(i, j, 1 / r)
+        i, j = compiled["voltage_sources"]
+        branch(i, j, n + np.arange(V))
+        i, j, l = compiled["inductors"]
+        branches = n + V + np.arange(len(l))
+        branch(i, j, branches)
+        if h is not None:
+            rows.append(branches)
+            cols.append(branches)
+            values.append(-l / h)
+            i, j, c = compiled["capacitors"]
+            conductance(i, j, c / h)
+
+        rows = np.concatenate([np.asarray(a, dtype=int).ravel() for a in rows])
+        cols = np.concatenate([np.asarray(a, dtype=int).ravel() for a in cols])
+        values = np.concatenate([np.asarray(a, dtype=float).ravel() for a in values])
+        return rows, cols, values
+
+    '''
+        Returns the terminal currents and Jacobian of every device at the node
+        voltages v, as (nodes (D, k), currents (D, k), jacobians (D, k, k)) per
+        device type, where currents flow into the device.
+    '''
+    def _device_stamps(self, v):
+        compiled = self._compile()
+        stamps = []
+
+        a, k, Is, nvt = compiled["diodes"]
+        if len(a) != 0:
+            i, g = _junction(v[a] - v[k], Is, nvt)
+            jac = np.stack((np.stack((g, -g), axis=1), np.stack((-g, g), axis=1)), axis=1)
+            stamps.append((np.stack((a, k), axis=1), np.stack((i, -i), axis=1), jac))
+
+        c, b, e, p, Is, beta_f, beta_r = compiled["bjts"]
+        if len(c) != 0:
+            i_f, g_f = _junction(p * (v[b] - v[e]), Is, VT)
+            i_r, g_r = _junction(p * (v[b] - v[c]), Is, VT)
+            i_c = i_f - i_r - i_r / beta_r
+            i_b = i_f / beta_f + i_r / beta_r
+            # Derivatives with respect to vbe and vbc
+            dc_be, dc_bc = g_f, -g_r - g_r / beta_r
+            db_be, db_bc = g_f / beta_f, g_r / beta_r
+            # Rows c, b of the Jacobian over the terminals (c, b, e)
+            row_c = np.stack((-dc_bc, dc_be + dc_bc, -dc_be), axis=1)
+            row_b = np.stack((-db_bc, db_be + db_bc, -db_be), axis=1)
+            jac = np.stack((row_c, row_b, -row_c - row_b), axis=1)
+            currents = p[:, None] * np.stack((i_c, i_b, -i_c - i_b), axis=1)
+            stamps.append((np.stack((c, b, e), axis=1), currents, jac))
+
+        d, g, s, p, k, vth, lambda_ = compiled["mosfets"]
+        if len(d) != 0:
+            vgs = p * (v[g] - v[s])
+            vds = p * (v[d] - v[s])
+            # Drain and source swap when vds < 0
+            reverse = vds < 0
+            vgs = np.where(reverse, vgs - vds, vgs)
+            vds = np.abs(vds)
+            vov = vgs - vth
+            on = vov > 0
+            saturated = vds >= vov
+            clm = 1 + lambda_ * vds
+            i_d = np.where(saturated, k / 2 * vov ** 2 * clm, k * (vov * vds - vds ** 2 / 2) * clm)
+            gm = np.where(saturated, k * vov * clm, k * vds * clm)
+            gds = np.where(
+                saturated, k / 2 * vov ** 2 * lambda_,
+                k * (vov - vds) * clm + k * (vov * vds - vds ** 2 / 2) * lambda_
+            )
+            i_d = np.where(on, i_d, 0) + GMIN * vds
+            gm = np.where(on, gm, 0)
+            gds = np.where(on, gds, 0) + GMIN
+            # Row d of the Jacobian over the terminals (d, g, s)
+            row_d = np.where(
+                reverse[:, None],
+                np.stack((gm + gds, -gm, -gds), axis=1),
+                np.stack((gds, gm, -gm - gds), axis=1)
+            )
+            i_d = p * np.where(reverse, -i_d, i_d)
+            jac = np.stack((row_d, np.zeros_like(row_d), -row_d), axis=1)
+            stamps.append((np.stack((d, g, s), axis=1), np.stack((i_d, np.zeros_like(i_d), -i_d), axis=1), jac))
+
+        return stamps
+
+    '''
+        Returns the right hand side at time t: the independent sources, plus the
+        companion model history of step h from the previous solution x_prev.
+    '''
+    def _sources(self, t, h=None, x_prev=None):
+        compiled = self._compile()
+        n = self.nodes
+        V = len(self.voltage_sources)
+        rhs = np.zeros(compiled["size"])
+
+        def value(source):
+            return source(t) if callable(source) else source
+
+        rhs[n:n + V] = [value(source[2]) for source in self.voltage_sources]
+        i, j = compiled["current_sources"]
+        currents = np.array([value(source[2]) for source in self.current_sources], dtype=float)
+        np.add.at(rhs, i, currents)
+        np.add.at(rhs, j, -currents)
+        if h is not None:
+            i, j, c = compiled["capacitors"]
+            history = c / h * (x_prev[i] - x_prev[j])
+            np.add.at(rhs, i, history)
+            np.add.at(rhs, j, -history)
+            l = compiled["inductors"][2]
+            branches = n + V + np.arange(len(l))
+            rhs[branches] = -l / h * x_prev[branches]
+        return rhs
+
+    '''
+        Solves the system with linear part (rows, cols, values) and right hand side
+        rhs by Newton-Raphson from x. The factorization is kept in self._factor under
+        key and reused while each iteration at least halves the residual.
+    '''
+    def _newton(self, x, rhs, linear, key):
+        from scipy import sparse
+        from scipy.sparse.linalg import splu
+
+        size = len(x)
+        rows, cols, values = linear
+        G = sparse.csr_array((values, (rows, cols)), shape=(size, size))
+        ground = self.ground
+
+        factor = self._factor[1] if self._factor is not None and self._factor[0] == key else None
+        previous = np.inf
+        for iteration in range(self.max_iterations):
+            f = G @ x - rhs
+            stamps = self._device_stamps(x[:self.nodes])
+            for nodes, currents, _ in stamps:
+                np.add.at(f, nodes, currents)
+            # The ground row is replaced by v_ground = 0
+            f[ground] = x[ground]
+
+            residual = np.max(np.abs(f))
+            if residual > previous / 2:
+                factor = None
+            if factor is None:
+                J_rows = [rows]
+                J_cols = [cols]
+                J_values = [values]
+                for nodes, _, jac in stamps:
+                    k = nodes.shape[1]
+                    J_rows.append(np.repeat(nodes, k, axis=1).ravel())
+                    J_cols.append(np.tile(nodes, (1, k)).ravel())
+                    J_values.append(jac.ravel())
+                J_rows = np.concatenate(J_rows)
+                J_cols = np.concatenate(J_cols)
+                J_values = np.concatenate(J_values)
+                keep = J_rows != ground
+                J = sparse.csc_array((
+                    np.append(J_values[keep], 1), (np.append(J_rows[keep], ground), np.append(J_cols[keep], ground))
+                ), shape=(size, size))
+                factor = splu(J)
+
+            dx = -factor.solve(f)
+            x = x + dx
+            previous = residual
+            if residual < self.abstol and np.all(np.abs(dx) < self.vntol + self.reltol * np.abs(x)):
+                self._factor = (key, factor)
+                return x
+        raise RuntimeError(f"Newton did not converge in {self.max_iterations} iterations")
+
+    '''
+        Returns the DC operating point at t: the node voltages, then the currents
+        through the voltage sources and inductors. x0 is the initial guess.
+    '''
+    def operating_point(self, t=0, x0=None):
+        if x0 is None:
+            x0 = np.zeros(self._compile()["size"])
+        return self._newton(x0, self._sources(t), self._linear_stamps(None), None)
+
+    '''
+        Returns the states r (capacitor voltages, then inductor currents) of the
+        solutions xs.
+    '''
+    def _states(self, xs):
+        compiled = self._compile()
+        i, j, _ = compiled["capacitors"]
+        L = len(self.inductors)
+        return np.concatenate((xs[i] - xs[j], xs[compiled["size"] - L:]))
+
+    '''
+        Integrates the circuit over t_range with fixed steps and returns ts, rs (the
+        capacitor voltages and inductor currents) and vs (the node voltages), each
+        with time along the last axis, like approx.CompiledCircuit.solve. The step is
+        the frame duration with fps, else step (by default a thousandth of t_range).
+        The transient starts from the operating point at t_range[0], or from the
+        solution x0.
+    '''
+    def solve(self, t_range, fps=None, step=None, x0=None):
+        if fps is not None:
+            ts = frame_times(t_range, fps)
+        else:
+            if step is None:
+                step = (t_range[1] - t_range[0]) / 1000
+            ts = np.append(np.arange(t_range[0], t_range[1], step), t_range[1])
+            ts = ts[np.concatenate(([True], np.diff(ts) > 1e-12))]
+
+        x = self.operating_point(ts[0]) if x0 is None else np.asarray(x0, dtype=float)
+        xs = np.empty((len(x), len(ts)))
+        xs[:, 0] = x
+        linear = {}
+        for k in range(1, len(ts)):
+            h = ts[k] - ts[k - 1]
+            key = round(h, 12)
+            if key not in linear:
+                linear[key] = self._linear_stamps(h)
+            x = self._newton(x, self._sources(ts[k], h, x), linear[key], key)
+            xs[:, k] = x
+        return ts, self._states(xs), xs[:self.nodes]
+
+    '''
+        Solves the circuit on the frame grid of an animation at fps and returns a
+        FrameTable for constant time lookups from scene updaters.
+    '''
+    def solve_frames(self, t_range, fps, x0=None):
+        return FrameTable(*self.solve(t_range, fps=fps, x0=x0), fps=fps)
@@ -0,0 +1,140 @@
+from manim import *
+
+'''
+    Scene mixin that rasterizes the mobjects that stay still into the camera's
+    background once, instead of on every frame. Manim only skips the mobjects that
+    come before the first moving one in the scene's order, so e.g. axes added after a
+    spring with an updater are redrawn every frame; here every still mobject is.
+
+    A top-level mobject is static for a play when neither it nor its family has
+    updaters or is animated by the play (with auto_static), or when it was passed to
+    mark_static and isn't animated. Mark mobjects whose updaters leave them unchanged.
+    The static layer is keyed by a fingerprint of its mobjects (points, colors,
+    z_index) and of the camera, checked once per play, and is re-rendered when any
+    of it changes. It is only rendered for plays that the renderer draws, so skipped
+    plays (e.g. outside the shard of a render.ShardedScene) don't cost a render. 
+    Static mobjects are composited under every moving one, whatever their order in 
+    the scene.
+
+    Plays that move the camera frame (a MovingCamera's frame animated or with 
+    updaters) have no static layer, since it would be drawn at the frame's position
+    at the start of the play, and are drawn in full.
+
+    Use it before Scene in the bases: class Intro(StaticLayerScene, Scene). Only the
+    Cairo renderer is supported.
+'''
+class StaticLayerScene:
+    auto_static = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._marked_static = []
+        self._static_key = None
+        self._static_image = None
+        self._base_background = None
+        self._static_layer = None
+
+    def mark_static(self, *mobjects):
+        for mobject in mobjects:
+            if mobject not in self._marked_static:
+                self._marked_static.append(mobject)
+        return self
+
+    def unmark_static(self, *mobjects):
+        self._marked_static = [mobject for mobject in self._marked_static if mobject not in mobjects]
+        return self
+
+    '''
+        Returns the top-level mobjects of the scene that are static for animations.
+    '''
+    def get_static_layer(self, animations):
+        animated = self._animated(animations)
+        static = []
+        for mobject in self.mobjects:
+            if mobject in self.foreground_mobjects:
+                continue
+            family = mobject.get_family()
+            if any(id(member) in animated for member in family):
+                continue
+            marked = mobject in self._marked_static
+            if marked or (self.auto_static and not mobject.get_family_updaters()):
+                static.append(mobject)
+        return static
+
+    @staticmethod
+    def _animated(animations):
+        return {
+            id(member)
+            for animation in animations
+            for member in animation.mobject.get_family()
+        }
+
+    def _camera_moves(self, animations):
+        frame = getattr(self.renderer.camera, "frame", None)
+        if frame is None:
+            return False
+        return id(frame) in self._animated(animations) or bool(frame.get_family_updaters())
+
+    def _fingerprint(self, static):
+        camera = self.renderer.camera
+        frame = getattr(camera, "frame", None)
+        key = [camera.pixel_width, camera.pixel_height, camera.frame_width, camera.frame_height, tuple(camera.frame_center)]
+        if frame is not None:
+            key.append(frame.points.tobytes())
+        for mobject in static:
+            for member in mobject.family_members_with_points():
+                key.append((
+                    id(member),
+                    member.z_index,
+                    member.points.tobytes(),
+                    member.get_stroke_rgbas().tobytes() if isinstance(member, VMobject) else None,
+                    member.get_fill_rgbas().tobytes() if isinstance(member, VMobject) else None,
+                ))
+        return hash(tuple(key))
+
+    def _render_static_layer(self, static):
+        camera = self.renderer.camera
+        camera.background = self._base_background
+        camera.reset()
+        camera.capture_mobjects(static)
+        self._static_image = camera.pixel_array.copy()
+
+    def compile_animation_data(self, *args, **kwargs):
+        result = super().compile_animation_data(*args, **kwargs)
+        camera = self.renderer.camera
+        if self._base_background is None:
+            self._base_background = camera.background
+        # Until begin_animations, frames are drawn over the plain background
+        camera.background = self._base_background
+        self._static_layer = None
+        if self.is_current_animation_frozen_frame() or self._camera_moves(self.animations):
+            # Frozen frames and plays that move the camera are drawn in full
+            return result
+
+        static = self._static_layer = self.get_static_layer(self.animations)
+        # The renderer draws moving mobjects over its static image, which starts from
+        # the camera's background
+        layer = {id(member) for mobject in static for member in mobject.get_family()}
+        self.moving_mobjects = [mobject for mobject in self.moving_mobjects if id(mobject) not in layer]
+        self.static_mobjects = [mobject for mobject in self.static_mobjects if id(mobject) not in layer]
+        return result
+
+    '''
+        Renders the static layer, if it changed, once the renderer has decided whether
+        the play is drawn, and before it saves its own static frame over the layer.
+    '''
+    def begin_animations(self):
+        super().begin_animations()
+        if self._static_layer is None or self.renderer.skip_animations:
+            return
+        key = self._fingerprint(self._static_layer)
+        if key != self._static_key:
+            self._render_static_layer(self._static_layer)
+            self._static_key = key
+        self.renderer.camera.background = self._static_image
+
+    def tear_down(self):
+        # The final frame draws every mobject, so it must not be on top of the layer
+        if self._base_background is not None:
+            self.renderer.camera.background = self._base_background
+        super().tear_down()
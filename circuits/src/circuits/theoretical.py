@@ -1,14 +1,40 @@
 import numpy as np
-from scipy import linalg
 
-from manim import *
-from . import circuit_mobjects as cmob
+from .connectivity import UnionFind
 
 NUMBERS = (int, float, complex, np.number)
 
+'''
+    Returns the rendering layer. circuit_mobjects imports all of Manim, so it is only
+    loaded the first time a mobject is requested; the numeric classes in this module 
+    never need it.
+'''
+def _cmob():
+    from . import circuit_mobjects
+    return circuit_mobjects
+
 class CircuitError(RuntimeError):
     pass
 
+'''
+    Evaluates the instantaneous (real) value of one or more phasors at one or more
+    times in a single broadcasted operation. The result has shape (*times, *p).
+'''
+def phasors_at(p, w, times):
+    return np.real(np.multiply.outer(np.exp(1j * w * np.asarray(times)), np.asarray(p)))
+
+'''
+    Evaluates the charge displaced by one or more current phasors at one or more 
+    times, i.e. the integral of the instantaneous current. For w=0 this is i * t.
+    The result has shape (*times, *i).
+'''
+def displacements_at(i, w, times):
+    times = np.asarray(times)
+    i = np.asarray(i)
+    if w != 0:
+        return np.imag(np.multiply.outer(np.exp(1j * w * times), i) / w)
+    return np.multiply.outer(times, np.real(i))
+
 '''
     Superclass for all circuit elements.
 '''
@@ -30,6 +56,7 @@ class CircuitElement:
         self._v = None
         self._i = None
         self._z = None
+        self._pending = False
         self.set_voltage(None, head=self.head)
         self.set_current(None, head=self.head)
         self.set_impedance(None)
@@ -46,6 +73,8 @@ class CircuitElement:
 
     '''
     def get_voltage(self, head=None, tail=None):
+        if self._pending:
+            self._derive()
         if self._v is None:
             return None
         if head == self.head or tail == self.tail:
@@ -104,6 +133,8 @@ class CircuitElement:
 
     '''
     def get_current(self, head=None, tail=None):
+        if self._pending:
+            self._derive()
         if self._i is None:
             return None
         if head == self.head or tail == self.tail:
@@ -145,6 +176,8 @@ class CircuitElement:
 
     '''
     def get_impedance(self):
+        if self._pending:
+            self._derive()
         return self._z
 
     '''
@@ -189,11 +222,67 @@ class CircuitElement:
         elif unknowns[0][0] == "z" and i != 0:
             self._z = v / i
     
+    '''
+        Stores a solved voltage, and current if the solver knows it, without the Ohm's
+        law cascade of the setters. Used by ACCircuit to write a whole solution at 
+        once. If smart_update is True, the missing quantity is derived on first read.
+    '''
+    def commit(self, v, i=None):
+        self._v = v
+        if i is not None:
+            self._i = i
+        self._pending = self.smart_update
+
+    def _derive(self):
+        self._pending = False
+        self.do_smart_update()
+
+    '''
+        Adds this element's equations to an MNASystem. By default an element with a 
+        known nonzero impedance is an admittance between its nodes, and otherwise an
+        element with a known voltage is a voltage source.
+    '''
+    def stamp(self, system):
+        impedance = self.get_impedance()
+        if isinstance(impedance, NUMBERS) and impedance != 0:
+            system.admittance(self.head, self.tail, 1 / impedance)
+            return
+        voltage = self.get_voltage(head=self.head)
+        if isinstance(voltage, NUMBERS):
+            system.voltage_source(self, [], voltage)
+            return
+        print(f"Warning: Element with unknown impedance {self}")
+
+    '''
+        Returns the current through this element from head to tail in terms of the 
+        unknowns of an MNASystem, as ([(column, coefficient)], constant).
+    '''
+    def current_terms(self, system):
+        impedance = self.get_impedance()
+        if isinstance(impedance, NUMBERS) and impedance != 0:
+            admittance = 1 / impedance
+            return [(system.node(self.head), admittance), (system.node(self.tail), -admittance)], 0
+        return [(system.branch(self), 1)], 0
+
+    '''
+        Returns the derivatives with respect to this element's value (resistance, 
+        capacitance, source value, gain...) at the MNA solution x: of the residual 
+        M x - b, as [(row, value)], and of current_terms at x. Returns None for 
+        elements without a value.
+    '''
+    def derivatives(self, system, x):
+        return None
+
+    def _admittance_derivatives(self, system, x, dy):
+        head, tail = system.node(self.head), system.node(self.tail)
+        dcurrent = dy * (x[head] - x[tail])
+        return [(head, dcurrent), (tail, -dcurrent)], dcurrent
+
     def get_mobject(self, *args, **kwargs):
         raise NotImplementedError()
 
     def get_current_mobject(self, time, current_speed, current_density, *args, **kwargs):
-        current_mobject = cmob.Current(
+        current_mobject = _cmob().Current(
             start=self.circuit.coords[self.head],
             end=self.circuit.coords[self.tail],
             i=self.get_current(self.head),
@@ -214,13 +303,16 @@ class Resistor(CircuitElement):
 
     def set_impedance(self, z):
         super().set_impedance(self._resistance)
+
+    def derivatives(self, system, x):
+        return self._admittance_derivatives(system, x, -1 / self._resistance ** 2)
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.Resistor(start, end, *args, **kwargs)
+        return _cmob().Resistor(start, end, *args, **kwargs)
     
 
 
@@ -232,13 +324,16 @@ class Capacitor(CircuitElement):
 
     def set_impedance(self, z):
         super().set_impedance(1/(1j * self.w * self._capacitance) if self.w != 0 else np.inf)
+
+    def derivatives(self, system, x):
+        return self._admittance_derivatives(system, x, 1j * self.w)
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.Capacitor(start, end, *args, **kwargs)
+        return _cmob().Capacitor(start, end, *args, **kwargs)
 
 
 class Inductor(CircuitElement):
@@ -248,13 +343,19 @@ class Inductor(CircuitElement):
 
     def set_impedance(self, z):
         super().set_impedance(1j * self.w * self._inductance)
+
+    def derivatives(self, system, x):
+        # At w=0 an inductor is a short whatever its inductance
+        if self.w == 0:
+            return [], 0
+        return self._admittance_derivatives(system, x, -1 / (1j * self.w * self._inductance ** 2))
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.Inductor(start, end, *args, **kwargs)
+        return _cmob().Inductor(start, end, *args, **kwargs)
 
 
 class IndependantVoltage(CircuitElement):
@@ -265,13 +366,25 @@ class IndependantVoltage(CircuitElement):
     def set_voltage(self, v, head=None, tail=None):
         super().set_voltage(v, head, tail)
         self._v = self._voltage
+
+    def commit(self, v, i=None):
+        super().commit(self._voltage, i)
+
+    def stamp(self, system):
+        system.voltage_source(self, [], self._voltage)
+
+    def current_terms(self, system):
+        return [(system.branch(self), 1)], 0
+
+    def derivatives(self, system, x):
+        return [(system.branch(self), -1)], 0
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.IndependantVoltage(start, end, *args, **kwargs)
+        return _cmob().IndependantVoltage(start, end, *args, **kwargs)
 
 
 class DependantVoltage(CircuitElement):
@@ -289,13 +402,24 @@ class DependantVoltage(CircuitElement):
                 self._v = self.a * voltage
                 return True
         return False
+
+    def stamp(self, system):
+        terms = [(system.node(self.dplus), -self.a), (system.node(self.dminus), self.a)]
+        system.voltage_source(self, terms, 0)
+
+    def current_terms(self, system):
+        return [(system.branch(self), 1)], 0
+
+    def derivatives(self, system, x):
+        control = x[system.node(self.dplus)] - x[system.node(self.dminus)]
+        return [(system.branch(self), -control)], 0
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.IndependantVoltage(start, end, *args, **kwargs)
+        return _cmob().IndependantVoltage(start, end, *args, **kwargs)
 
 class Wire(CircuitElement):
     def __init__(self, *args, **kwargs):
@@ -306,13 +430,247 @@ class Wire(CircuitElement):
 
     def set_voltage(self, v, head=None, tail=None):
         super().set_voltage(0, head, tail)
+
+    def commit(self, v, i=None):
+        super().commit(0, i)
+
+    # Wires are merged into their nodes before stamping
+    def stamp(self, system):
+        pass
+
+    def current_terms(self, system):
+        raise CircuitError("Wire currents are only known after calculate_currents")
     
     def get_mobject(self, *args, **kwargs):
         if self.circuit is None:
             raise ValueError("Cannot get coords for Mobject. circuit is None")
         start = self.circuit.coords[self.head]
         end = self.circuit.coords[self.tail]
-        return cmob.Wire(start, end, *args, **kwargs)
+        return _cmob().Wire(start, end, *args, **kwargs)
+
+'''
+    An ideal current source driving i through itself from head to tail.
+'''
+class IndependantCurrent(CircuitElement):
+    def __init__(self, i, *args, **kwargs):
+        self._current = i
+        super().__init__(*args, **kwargs)
+
+    def set_current(self, i, head=None, tail=None):
+        super().set_current(i, head, tail)
+        self._i = self._current
+
+    def commit(self, v, i=None):
+        super().commit(v, self._current)
+
+    def stamp(self, system):
+        system.current_source(self.head, self.tail, [], self._current)
+
+    def current_terms(self, system):
+        return [], self._current
+
+    def derivatives(self, system, x):
+        return [(system.node(self.head), 1), (system.node(self.tail), -1)], 1
+
+    def get_mobject(self, *args, **kwargs):
+        if self.circuit is None:
+            raise ValueError("Cannot get coords for Mobject. circuit is None")
+        start = self.circuit.coords[self.head]
+        end = self.circuit.coords[self.tail]
+        return _cmob().IndependantCurrent(start, end, *args, **kwargs)
+
+'''
+    Voltage controlled current source: drives g * V(dplus, dminus) from head to tail.
+'''
+class DependantCurrent(CircuitElement):
+    def __init__(self, g, dplus, dminus, *args, **kwargs):
+        self.g = g
+        self.dplus = dplus
+        self.dminus = dminus
+        self.smart_update = False
+        super().__init__(*args, **kwargs)
+
+    def current_terms(self, system):
+        return [(system.node(self.dplus), self.g), (system.node(self.dminus), -self.g)], 0
+
+    def derivatives(self, system, x):
+        control = x[system.node(self.dplus)] - x[system.node(self.dminus)]
+        return [(system.node(self.head), control), (system.node(self.tail), -control)], control
+
+    def stamp(self, system):
+        system.current_source(self.head, self.tail, *self.current_terms(system))
+
+    def get_mobject(self, *args, **kwargs):
+        if self.circuit is None:
+            raise ValueError("Cannot get coords for Mobject. circuit is None")
+        start = self.circuit.coords[self.head]
+        end = self.circuit.coords[self.tail]
+        return _cmob().IndependantCurrent(start, end, *args, **kwargs)
+
+'''
+    Current controlled current source: drives a times the current through control
+    (from its head to its tail) from head to tail.
+'''
+class CurrentControlledCurrent(CircuitElement):
+    def __init__(self, a, control, *args, **kwargs):
+        self.a = a
+        self.control = control
+        self.smart_update = False
+        super().__init__(*args, **kwargs)
+
+    def current_terms(self, system):
+        terms, constant = self.control.current_terms(system)
+        return [(column, self.a * coefficient) for column, coefficient in terms], self.a * constant
+
+    def derivatives(self, system, x):
+        control = system.evaluate(self.control.current_terms(system), x)
+        return [(system.node(self.head), control), (system.node(self.tail), -control)], control
+
+    '''
+        Like derivatives, for a change dcontrol of the control's current at fixed x.
+    '''
+    def control_derivatives(self, system, dcontrol):
+        dcurrent = self.a * dcontrol
+        return [(system.node(self.head), dcurrent), (system.node(self.tail), -dcurrent)], dcurrent
+
+    def stamp(self, system):
+        system.current_source(self.head, self.tail, *self.current_terms(system))
+
+    def get_mobject(self, *args, **kwargs):
+        if self.circuit is None:
+            raise ValueError("Cannot get coords for Mobject. circuit is None")
+        start = self.circuit.coords[self.head]
+        end = self.circuit.coords[self.tail]
+        return _cmob().IndependantCurrent(start, end, *args, **kwargs)
+
+'''
+    Current controlled voltage source: V(head, tail) = r times the current through 
+    control (from its head to its tail).
+'''
+class CurrentControlledVoltage(CircuitElement):
+    def __init__(self, r, control, *args, **kwargs):
+        self.r = r
+        self.control = control
+        self.smart_update = False
+        super().__init__(*args, **kwargs)
+
+    def stamp(self, system):
+        terms, constant = self.control.current_terms(system)
+        system.voltage_source(self, [(column, -self.r * coefficient) for column, coefficient in terms], self.r * constant)
+
+    def current_terms(self, system):
+        return [(system.branch(self), 1)], 0
+
+    def derivatives(self, system, x):
+        control = system.evaluate(self.control.current_terms(system), x)
+        return [(system.branch(self), -control)], 0
+
+    def control_derivatives(self, system, dcontrol):
+        return [(system.branch(self), -self.r * dcontrol)], 0
+
+    def get_mobject(self, *args, **kwargs):
+        if self.circuit is None:
+            raise ValueError("Cannot get coords for Mobject. circuit is None")
+        start = self.circuit.coords[self.head]
+        end = self.circuit.coords[self.tail]
+        return _cmob().IndependantVoltage(start, end, *args, **kwargs)
+
+'''
+    The modified nodal analysis equations of a circuit, collected as sparse entries
+    while elements stamp themselves. The unknowns are the voltages of the nodes left 
+    after merging wires, followed by one branch current per voltage defined element,
+    allocated the first time anything asks for it. The ground node's KCL row is 
+    replaced by V(ground) = 0.
+'''
+class MNASystem:
+    def __init__(self, labels, ground):
+        self.labels = labels
+        self.nodes = labels.max() + 1
+        self.ground = labels[ground]
+        self.branches = {}
+        self.branch_elements = []
+        self._rows = []
+        self._cols = []
+        self._values = []
+        self._rhs_rows = []
+        self._rhs_values = []
+
+    def node(self, n):
+        return self.labels[n]
+
+    def branch(self, elem):
+        column = self.branches.get(id(elem))
+        if column is None:
+            column = self.branches[id(elem)] = self.nodes + len(self.branch_elements)
+            self.branch_elements.append(elem)
+        return column
+
+    def add(self, row, column, value):
+        self._rows.append(row)
+        self._cols.append(column)
+        self._values.append(value)
+
+    def add_rhs(self, row, value):
+        self._rhs_rows.append(row)
+        self._rhs_values.append(value)
+
+    def admittance(self, head, tail, y):
+        head, tail = self.node(head), self.node(tail)
+        self.add(head, head, y)
+        self.add(tail, tail, y)
+        self.add(head, tail, -y)
+        self.add(tail, head, -y)
+
+    '''
+        A current from head to tail of sum(coefficient * unknown) + constant.
+    '''
+    def current_source(self, head, tail, terms, constant):
+        head, tail = self.node(head), self.node(tail)
+        for column, coefficient in terms:
+            self.add(head, column, coefficient)
+            self.add(tail, column, -coefficient)
+        self.add_rhs(head, -constant)
+        self.add_rhs(tail, constant)
+
+    '''
+        V(head, tail) + sum(coefficient * unknown) = constant for elem, whose branch
+        current flows from head to tail.
+    '''
+    def voltage_source(self, elem, terms, constant):
+        branch = self.branch(elem)
+        head, tail = self.node(elem.head), self.node(elem.tail)
+        self.add(head, branch, 1)
+        self.add(tail, branch, -1)
+        self.add(branch, head, 1)
+        self.add(branch, tail, -1)
+        for column, coefficient in terms:
+            self.add(branch, column, coefficient)
+        self.add_rhs(branch, constant)
+
+    '''
+        Returns the value of current_terms at the solution x.
+    '''
+    def evaluate(self, current_terms, x):
+        terms, constant = current_terms
+        return sum(coefficient * x[column] for column, coefficient in terms) + constant
+
+    def solve(self):
+        size = self.nodes + len(self.branch_elements)
+        rows = np.array(self._rows, dtype=int)
+        cols = np.array(self._cols, dtype=int)
+        values = np.array(self._values, dtype=np.complex128)
+        keep = rows != self.ground
+        matrix = np.zeros((size, size), dtype=np.complex128)
+        np.add.at(matrix, (rows[keep], cols[keep]), values[keep])
+        matrix[self.ground, self.ground] = 1
+
+        rhs_rows = np.array(self._rhs_rows, dtype=int)
+        rhs_values = np.array(self._rhs_values, dtype=np.complex128)
+        keep = rhs_rows != self.ground
+        rhs = np.zeros(size, dtype=np.complex128)
+        np.add.at(rhs, rhs_rows[keep], rhs_values[keep])
+        self.matrix = matrix
+        return np.linalg.solve(matrix, rhs)
 
 
 class ACCircuit:
@@ -332,78 +690,110 @@ class ACCircuit:
 
         if coords is None:
             self.coords = np.zeros(shape=(self.nodes, 3))
+        else:
+            self.coords = np.asarray(coords)
         self.current_speed = current_speed
         self.current_density = current_density
     
-    def get_nodal_analysis_equ(self, node, SN=None):
-        if SN is None:
-            SN = {node}
-        equ = np.zeros(shape=self.nodes+1, dtype=np.complex128)
-        sumY = 0
-        for m in range(self.nodes):
-            if m in SN:
-                continue
-            elem = self[m, node]
-            if elem is None:
-                continue
-            impedance = elem.get_impedance()
-            if isinstance(impedance, NUMBERS):
-                admittance = 1 / impedance
-            else:
-                admittance = 0
-                print(f"Warning: Element with unknown impedance {elem}")
-            sumY += admittance
-            equ[m] = admittance
-        equ[node] = -sumY
-        return equ
+    '''
+        Merges the nodes joined by wires, which only exist for layout. Returns the 
+        reduced node of every node, as an array of labels 0..k-1, and k.
+    '''
+    def collapse_wires(self):
+        wires = [(elem.head, elem.tail) for elem in self.get_elements() if isinstance(elem, Wire)]
+        labels = UnionFind(self.nodes).union_all(wires).labels()
+        return labels, labels.max() + 1
 
+    '''
+        Solves for every node voltage by modified nodal analysis, in one pass of 
+        CircuitElement.stamp over the elements. The currents of voltage and current
+        sources are known afterwards; call calculate_currents for the rest.
+    '''
     def nodal_analysis(self):
-        super_nodes = [{x} for x in range(self.nodes)]
-        ground_equ = np.zeros(shape=self.nodes+1)
-        ground_equ[self.ground] = 1
-        equs = [ground_equ]
-        for i in range(self.nodes - 1):
-            for j in range(i + 1, self.nodes):
-                add_to_supernode = False
-                if isinstance(self[i, j], DependantVoltage):
-                    equ = np.zeros(shape=self.nodes+1)
-                    dvolt = self[i, j]
-                    equ[dvolt.head] += 1
-                    equ[dvolt.tail] -= 1
-                    equ[dvolt.dplus] -= dvolt.a
-                    equ[dvolt.dminus] += dvolt.a
-                    equs.append(equ)
-                    add_to_supernode = True
-                else:
-                    voltage = self.get_element_voltage(i, j)
-                    if isinstance(voltage, NUMBERS):
-                        equ = np.zeros(shape=self.nodes+1)
-                        equ[i] = 1
-                        equ[j] = -1
-                        equ[-1] = voltage
-                        equs.append(equ)
-                        add_to_supernode = True
-                if add_to_supernode:
-                    less, more = (i, j) if i < j else (j, i)
-                    super_nodes[less].update(super_nodes[more])
-                    super_nodes[more] = super_nodes[less]
-        new_super_nodes = []
-        for super_node in super_nodes:
-            if super_node not in new_super_nodes:
-                new_super_nodes.append(super_node)
-        super_nodes = new_super_nodes
-
-        for super_node in super_nodes:
-            if self.ground in super_node:
-                continue
-            equ = np.sum([self.get_nodal_analysis_equ(node, SN=super_node) for node in super_node], axis=0)
-            equs.append(equ)
-        equs = np.array(equs)
-        solution = linalg.solve(equs[:,:-1], equs[:,-1])
-        self._voltages = solution.flatten()
+        labels, _ = self.collapse_wires()
+        system = MNASystem(labels, self.ground)
+        for elem in self.get_elements():
+            elem.stamp(system)
+        solution = system.solve()
+
+        self._voltages = solution[labels]
         self._known_voltages = [True] * self.nodes
+        self._system = system
+        self._solution = solution
+        self.commit(system, solution)
+
+    '''
+        Returns the derivatives of outputs with respect to the value of every element,
+        as an array of shape (outputs, elements) aligned with get_elements(). Outputs
+        are node indices, for node voltages, or elements, for their current from head
+        to tail. Elements without a value (wires) get nan.
+
+        Uses the adjoint method: one solve of the transposed nodal system for all 
+        outputs together, instead of one perturbed solve per element. Call 
+        nodal_analysis first.
+    '''
+    def sensitivities(self, outputs):
+        system = self._system
+        x = self._solution
+        elements = self.get_elements()
+
+        # y = c . x + constant for every output
+        c = np.zeros((len(x), len(outputs)), dtype=np.complex128)
+        for k, output in enumerate(outputs):
+            if isinstance(output, CircuitElement):
+                for column, coefficient in output.current_terms(system)[0]:
+                    c[column, k] += coefficient
+            else:
+                c[system.node(output), k] = 1
+        # The ground row is not a KCL equation and never depends on an element
+        adjoint = np.linalg.solve(system.matrix.T, c)
+        adjoint[system.ground] = 0
+
+        # Controlled sources also change when the current of their control does
+        dependants = {}
+        for elem in elements:
+            control = getattr(elem, "control", None)
+            if control is not None:
+                dependants.setdefault(id(control), []).append(elem)
+
+        result = np.zeros((len(outputs), len(elements)), dtype=np.complex128)
+        for j, elem in enumerate(elements):
+            derivatives = elem.derivatives(system, x)
+            if derivatives is None:
+                result[:, j] = np.nan
+                continue
+            residual, current = derivatives
+            residual = list(residual)
+            currents = {}
+            changes = [(elem, current)]
+            while len(changes) != 0:
+                changed, dcurrent = changes.pop()
+                currents[id(changed)] = currents.get(id(changed), 0) + dcurrent
+                for dependant in dependants.get(id(changed), []):
+                    dependant_residual, dependant_current = dependant.control_derivatives(system, dcurrent)
+                    residual += dependant_residual
+                    if dependant_current != 0:
+                        changes.append((dependant, dependant_current))
+
+            for row, value in residual:
+                result[:, j] -= value * adjoint[row]
+            for k, output in enumerate(outputs):
+                result[k, j] += currents.get(id(output), 0)
+        return result
 
-        [elem.update_voltage() for row in self.adj for elem in row if elem is not None]
+    '''
+        Writes a solution into every element in one pass: element voltages are 
+        computed together and the solved branch currents are stored as they are. 
+        Anything else is derived by Ohm's law when first read.
+    '''
+    def commit(self, system, solution):
+        elements = self.get_elements()
+        heads = np.array([elem.head for elem in elements], dtype=int)
+        tails = np.array([elem.tail for elem in elements], dtype=int)
+        voltages = self._voltages[heads] - self._voltages[tails]
+        for elem, voltage in zip(elements, voltages):
+            branch = system.branches.get(id(elem))
+            elem.commit(voltage, None if branch is None else solution[branch])
 
     def calculate_currents(self):
         trees = []
@@ -500,9 +890,94 @@ class ACCircuit:
     def get_voltage(self, i):
         return self._voltages[i] if self._known_voltages[i] else None
 
-    def get_mobjects(self, coords, mob_kwargs : dict = None, *args, **kwargs):
-        self.coords = coords
-        return cmob.ACCircuit(self, mob_kwargs, *args, **kwargs)
+    '''
+        Returns the elements of the circuit ordered by (i, j) with i < j. This is the
+        order of the branch axis of get_branch_currents() and evaluate().
+    '''
+    def get_elements(self):
+        return [
+            self.adj[j][i]
+            for i in range(self.nodes - 1)
+            for j in range(i + 1, self.nodes)
+            if self.adj[j][i] is not None
+        ]
+
+    '''
+        Returns the index of every element in get_elements(), keyed by its node pair
+        (i, j) with i < j. This is the element id used by the solver's arrays and by 
+        circuit_mobjects.ACCircuit.
+    '''
+    def get_element_ids(self):
+        return {
+            (min(elem.head, elem.tail), max(elem.head, elem.tail)): k
+            for k, elem in enumerate(self.get_elements())
+        }
+
+    '''
+        Returns the node voltage phasors as an array. Unknown voltages are nan.
+    '''
+    def get_node_phasors(self):
+        return np.array([
+            v if self._known_voltages[n] else np.nan
+            for n, v in enumerate(self._voltages)
+        ], dtype=np.complex128)
+
+    '''
+        Returns the current phasor of each element (from head to tail) in the order 
+        of get_elements(). Unknown currents are nan.
+    '''
+    def get_branch_currents(self):
+        currents = [elem.get_current(head=elem.head) for elem in self.get_elements()]
+        return np.array([
+            i if isinstance(i, NUMBERS) else np.nan
+            for i in currents
+        ], dtype=np.complex128)
+
+    '''
+        Evaluates the whole circuit at the given time(s). Returns the instantaneous
+        node voltages with shape (*times, nodes) and the charge displaced through each
+        element with shape (*times, branches), in the order of get_elements().
+    '''
+    def evaluate(self, times):
+        voltages = phasors_at(self.get_node_phasors(), self.w, times)
+        displacements = displacements_at(self.get_branch_currents(), self.w, times)
+        return voltages, displacements
+
+    '''
+        Computes node coordinates with layout.layout from the connections of the 
+        circuit, sets them as coords and returns them. options are passed to 
+        layout.layout.
+    '''
+    def auto_layout(self, **options):
+        from .layout import layout
+
+        edges = [(elem.head, elem.tail) for elem in self.get_elements()]
+        self.coords = layout(self.nodes, edges, **options)
+        return self.coords
+
+    def _layout_coords(self, coords):
+        if coords is not None:
+            self.coords = coords
+        elif not np.any(self.coords):
+            # Every node at the origin: no coords were given
+            self.auto_layout()
+
+    '''
+        Returns the circuit_mobjects.ACCircuit of the circuit, drawn at coords, or at
+        the coords given to the constructor, or else at an automatic layout.
+    '''
+    def get_mobjects(self, coords=None, mob_kwargs : dict = None, *args, **kwargs):
+        self._layout_coords(coords)
+        return _cmob().ACCircuit(self, mob_kwargs, *args, **kwargs)
+
+    '''
+        Like get_mobjects, but animated from precomputed (frames, nodes) voltages and 
+        (frames, branches) currents, e.g. from a transient simulation. See 
+        circuit_mobjects.TransientCircuit.
+    '''
+    def get_transient_mobjects(self, coords, voltages, currents=None, fps=60, t0=0, mob_kwargs : dict = None, *args, **kwargs):
+        self._layout_coords(coords)
+        return _cmob().TransientCircuit(self, voltages, currents, fps, t0, mob_kwargs, *args, **kwargs)
 
 
 if __name__ == "__main__":
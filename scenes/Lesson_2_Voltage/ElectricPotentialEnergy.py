@@ -1,9 +1,11 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from circuits.circuit_mobjects import *
+from circuits.labels import NumericLabel
 from global_funcs import *
 from manim_extensions import *
 
-class ElectricPotentialEnergy(Scene):
+class ElectricPotentialEnergy(StaticLayerScene, Scene):
     def construct(self):
         max_pe = 1000
         line1_pos = ValueTracker(-6)
@@ -54,14 +56,15 @@ class ElectricPotentialEnergy(Scene):
             pe1 = 0.5 * k * dx1 ** 2
             pe2 = 0.5 * k * dx2 ** 2
             return pe1 + pe2
-        pe = always_redraw(lambda: MathTex("PE=" + str(round(get_pe(), 1)) + "J").shift(UP * 1.5).align_to(LEFT * 5, LEFT))
+        pe = NumericLabel(get_pe(), prefix="PE=", suffix="J").shift(UP * 1.5).align_to(LEFT * 5, LEFT)
+        pe.add_updater(lambda m: m.set_value(get_pe()))
 
         tracker_size = 0.3
         line4 = always_redraw(lambda: Line(ORIGIN, DOWN * tracker_size).next_to(line1, DOWN))
         line5 = always_redraw(lambda: Line(ORIGIN, DOWN * tracker_size).next_to(line3, DOWN))
         line6 = always_redraw(lambda: DashedLine(line4.get_midpoint(), line5.get_midpoint()))
-        dx_tracker = always_redraw(
-            lambda: MathTex(f"r={round((line3_pos.get_value() - line2_pos.get_value()) * 2 * spring_size / equ_length, 1)}").next_to(line6, DOWN)
+        dx_tracker = NumericLabel(prefix="r=").add_updater(
+            lambda m: m.set_value((line3_pos.get_value() - line2_pos.get_value()) * 2 * spring_size / equ_length).next_to(line6, DOWN)
         )
         
         self.add(spring1, spring2, line1, line2, line3, arrow1, arrow2, pe, line4, line5, line6, dx_tracker)
@@ -195,14 +198,15 @@ class ElectricPotentialEnergy(Scene):
             .set_color(ELECTRIC_PE_COLOR)
         )
 
-        pe = always_redraw(lambda: MathTex("PE=" + str(round(get_pe(), 1)) + "J").shift(UP * 1.5).align_to(LEFT * 5, LEFT))
+        pe = NumericLabel(get_pe(), prefix="PE=", suffix="J").shift(UP * 1.5).align_to(LEFT * 5, LEFT)
+        pe.add_updater(lambda m: m.set_value(get_pe()))
 
         tracker_size = 0.3
         line4 = always_redraw(lambda: Line(ORIGIN, DOWN * tracker_size).next_to(left_charge, DOWN))
         line5 = always_redraw(lambda: Line(ORIGIN, DOWN * tracker_size).next_to(right_charge, DOWN))
         line6 = always_redraw(lambda: DashedLine(line4.get_midpoint(), line5.get_midpoint()))
-        dx_tracker = always_redraw(
-            lambda: MathTex(f"r={round(get_r(), 1)}").next_to(line6, DOWN)
+        dx_tracker = NumericLabel(prefix="r=").add_updater(
+            lambda m: m.set_value(get_r()).next_to(line6, DOWN)
         )
         
         # Graph
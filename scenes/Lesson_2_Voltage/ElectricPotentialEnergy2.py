@@ -1,4 +1,5 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from global_funcs import *
 from manim_extensions import *
 
@@ -7,7 +8,7 @@ def map(val, min1, max1, min2, max2):
     val = val * (max2 - min2) + min2
     return val
 
-class ElectricPotentialEnergy2(Scene):
+class ElectricPotentialEnergy2(StaticLayerScene, Scene):
     def construct(self):
         left_charge = VGroup(
             Circle(radius=0.3, fill_opacity=1).set_color(ELECTRIC_PE_COLOR),
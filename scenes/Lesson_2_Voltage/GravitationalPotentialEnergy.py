@@ -1,7 +1,9 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from stickman import *
+from circuits.labels import NumericLabel
 
-class GravitationalPotentialEnergy(Scene):
+class GravitationalPotentialEnergy(StaticLayerScene, Scene):
     def construct(self):
         skyscraper = SVGMobject("./svgs/skyscraper.svg").scale(3)
         self.add(skyscraper)
@@ -12,7 +14,9 @@ class GravitationalPotentialEnergy(Scene):
         line1 = Line(height_count_width / 2 * LEFT, height_count_width / 2 * RIGHT)
         line2 = always_redraw(lambda: line1.copy().shift(height_count.get_value() * UP))
         line3 = always_redraw(lambda: DashedLine(line1.get_midpoint(), line2.get_midpoint()))
-        text  = always_redraw(lambda: Text(str(round(height_count.get_value() / 6 * 300)) + "m").next_to(line3, LEFT))
+        text  = NumericLabel(num_decimal_places=0, suffix="m", tex=False).add_updater(
+            lambda m: m.set_value(height_count.get_value() / 6 * 300).next_to(line3, LEFT)
+        )
         line1.next_to(skyscraper, LEFT).align_to(skyscraper, DOWN)
         height_count_group = VGroup(line1, line2, line3, text)
         self.add(height_count_group)
@@ -1,8 +1,9 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from circuits.circuit_mobjects import *
 from circuits import theoretical as tl
 
-class Intro(Scene):
+class Intro(StaticLayerScene, Scene):
     def construct(self):
         # Build Circuit
         circuit = tl.ACCircuit(nodes=4, w=0)
@@ -1,8 +1,9 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from circuits.circuit_mobjects import *
 from global_funcs import *
 
-class SpringPotentialEnergy(Scene):
+class SpringPotentialEnergy(StaticLayerScene, Scene):
     def construct(self):
         inductor = InductorElement(DOWN * 4, ORIGIN, 1, 4, 1)
         spring = VGroup(
@@ -1,8 +1,9 @@
 from manim import *
+from circuits.static_layer import StaticLayerScene
 from circuits.circuit_mobjects import *
 from global_funcs import *
 
-class SpringPotentialEnergy2(Scene):
+class SpringPotentialEnergy2(StaticLayerScene, Scene):
     def construct(self):
         max_pe = 350
 
@@ -0,0 +1,289 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from manim import Scene, config, tempconfig
+from manim.utils.exceptions import EndSceneEarlyException
+from tqdm import tqdm
+
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+'''
+    Returns (module name, scene name) for every Scene subclass in a lesson folder, in
+    the order the lesson plays them. If the lesson lists its modules in scene_list 
+    (scenes.txt, one module name per line) they are taken in that order, otherwise 
+    every module is scanned by file name. Only the scenes a module defines itself are
+    returned, not those it imports (e.g. test scenes of helper modules).
+'''
+def discover_scenes(lesson_dir, scene_list="scenes.txt"):
+    lesson_dir = os.path.abspath(lesson_dir)
+    if lesson_dir not in sys.path:
+        sys.path.insert(0, lesson_dir)
+
+    list_file = os.path.join(lesson_dir, scene_list)
+    if os.path.exists(list_file):
+        with open(list_file) as f:
+            names = [line.strip() for line in f if line.strip()]
+    else:
+        names = [file[:-3] for file in sorted(os.listdir(lesson_dir)) if file.endswith(".py")]
+
+    scenes = []
+    for name in names:
+        module = importlib.import_module(name)
+        for obj in vars(module).values():
+            if not isinstance(obj, type) or not issubclass(obj, Scene):
+                continue
+            if obj.__module__ != module.__name__:
+                continue
+            scenes.append((obj.__module__, obj.__name__))
+    return scenes
+
+'''
+    Mixin that renders only the frames [first, last) of shard. Every play before the
+    shard is fast-forwarded without drawing any frame: the scene is constructed as 
+    usual, and by default updaters are still stepped once per frame so time-driven 
+    state (timers like circuit_mobjects.ACCircuit's, trajectories precomputed in 
+    construct, dt updaters) arrives at the shard's start exactly as in a full render.
+    The scene ends early once the shard is written.
+
+    With measure_file set, nothing is rendered and the total number of frames of the
+    scene is written to measure_file instead.
+'''
+class ShardedScene:
+    shard = None
+    measure_file = None
+    step_skipped_frames = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shard_frame = 0
+        self._play_frames = 0
+        self._frame_in_play = 0
+        self._shard_partial = False
+
+    def play(self, *args, **kwargs):
+        if self.shard is not None and self.measure_file is None and self._shard_frame >= self.shard[1]:
+            raise EndSceneEarlyException()
+        super().play(*args, **kwargs)
+        self._shard_frame += self._play_frames
+
+    def compile_animation_data(self, *args, **kwargs):
+        result = super().compile_animation_data(*args, **kwargs)
+        dt = 1 / config.frame_rate
+        static = self.is_current_animation_frozen_frame()
+        if static:
+            frames = int(self.duration / dt)
+        else:
+            frames = len(np.arange(0, self.duration, dt))
+        self._play_frames = frames
+        self._frame_in_play = 0
+        self._shard_partial = False
+
+        if self.measure_file is not None:
+            self.renderer.skip_animations = True
+            self.static_mobjects = []
+            return result
+        if self.shard is None:
+            return result
+        first, last = self.shard
+        start = self._shard_frame
+        inside = max(0, min(last, start + frames) - max(first, start))
+        if inside == 0:
+            self.renderer.skip_animations = True
+            # Nothing is drawn, not even the static frame of the play
+            self.static_mobjects = []
+        elif inside != frames:
+            if static:
+                # A frozen frame is written duration / dt times
+                self.duration = (inside + 0.5) * dt
+            else:
+                self._shard_partial = True
+        return result
+
+    def get_time_progression(self, run_time, *args, **kwargs):
+        if self.shard is not None and self.measure_file is None and self.step_skipped_frames and self.renderer.skip_animations:
+            return tqdm(np.arange(0, run_time, 1 / config.frame_rate), disable=True)
+        return super().get_time_progression(run_time, *args, **kwargs)
+
+    def update_to_time(self, t):
+        if self._shard_partial:
+            frame = self._shard_frame + self._frame_in_play
+            self._frame_in_play += 1
+            outside = not (self.shard[0] <= frame < self.shard[1])
+            # skip_animations only drops the frame once it is drawn, so the drawing is
+            # skipped as well
+            self.renderer.skip_animations = outside
+            self.skip_animation_preview = outside
+        super().update_to_time(t)
+
+    def play_internal(self, skip_rendering=False):
+        skipping = self.renderer.skip_animations
+        preview = self.skip_animation_preview
+        # Plays outside the shard, or measured, only step the updaters
+        if self.shard is not None or self.measure_file is not None:
+            skip_rendering = skip_rendering or skipping
+        try:
+            super().play_internal(skip_rendering)
+        finally:
+            self.renderer.skip_animations = skipping
+            self.skip_animation_preview = preview
+
+    def tear_down(self):
+        super().tear_down()
+        if self.measure_file is not None:
+            with open(self.measure_file, "w") as f:
+                f.write(str(self._shard_frame))
+
+def _render_scene(task):
+    lesson_dir, module_name, scene_name, options, shard, measure_file = task
+    if lesson_dir not in sys.path:
+        sys.path.insert(0, lesson_dir)
+    # Lessons load their assets (e.g. ./svgs) relative to their own folder
+    os.chdir(lesson_dir)
+    scene_class = getattr(importlib.import_module(module_name), scene_name)
+    if shard is not None or measure_file is not None:
+        scene_class = type(scene_name, (ShardedScene, scene_class), {
+            "shard": shard,
+            "measure_file": measure_file,
+        })
+    with tempconfig(options):
+        scene = scene_class()
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+def _render_options(quality, media_dir):
+    return {
+        "quality": QUALITIES.get(quality, quality),
+        "media_dir": media_dir,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+        "disable_caching": True,
+    }
+
+'''
+    Concatenates movie files, in order, into output without re-encoding.
+'''
+def stitch(movie_files, output):
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    list_file = output + ".txt"
+    with open(list_file, "w") as f:
+        for movie_file in movie_files:
+            path = os.path.abspath(movie_file).replace("'", "'\\''")
+            f.write(f"file '{path}'\n")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output],
+        check=True
+    )
+    os.remove(list_file)
+    return output
+
+'''
+    Renders every scene of a lesson in a process pool, one scene per worker, and
+    stitches the resulting movies in lesson order. Each worker gets its own media
+    directory so that concurrent renders never share partial movie or Tex files.
+
+    Returns the list of movie files, and the stitched movie if output is given.
+'''
+def render_lesson(lesson_dir, workers=None, quality="m", media_dir="media", output=None, scenes=None):
+    lesson_dir = os.path.abspath(lesson_dir)
+    media_dir = os.path.abspath(media_dir)
+    if scenes is None:
+        scenes = discover_scenes(lesson_dir)
+
+    tasks = []
+    for index, (module_name, scene_name) in enumerate(scenes):
+        options = _render_options(quality, os.path.join(media_dir, "parallel", f"{index:03d}_{scene_name}"))
+        tasks.append((lesson_dir, module_name, scene_name, options, None, None))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        movie_files = list(executor.map(_render_scene, tasks))
+
+    if output is not None:
+        return movie_files, stitch(movie_files, output)
+    return movie_files
+
+'''
+    Renders a single scene as shards of consecutive frames in a process pool and 
+    stitches them. The scene is first constructed once without rendering to count 
+    its frames, which are then split evenly between the shards. Intended for long
+    time-parameterized scenes that cannot use scene-level parallelism.
+'''
+def render_scene_sharded(lesson_dir, module_name, scene_name, shards, workers=None, quality="m", media_dir="media", output=None):
+    lesson_dir = os.path.abspath(lesson_dir)
+    media_dir = os.path.abspath(os.path.join(media_dir, "shards", scene_name))
+    os.makedirs(media_dir, exist_ok=True)
+    measure_file = os.path.join(media_dir, "frames.txt")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        executor.submit(_render_scene, (
+            lesson_dir, module_name, scene_name, _render_options(quality, os.path.join(media_dir, "measure")), None, measure_file
+        )).result()
+        with open(measure_file) as f:
+            frames = int(f.read())
+
+        bounds = np.linspace(0, frames, shards + 1).astype(int)
+        tasks = [
+            (lesson_dir, module_name, scene_name, _render_options(quality, os.path.join(media_dir, f"{index:03d}")), (first, last), None)
+            for index, (first, last) in enumerate(zip(bounds[:-1], bounds[1:]))
+            if last > first
+        ]
+        movie_files = list(executor.map(_render_scene, tasks))
+
+    if output is not None:
+        return movie_files, stitch(movie_files, output)
+    return movie_files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the scenes of a lesson in parallel.")
+    parser.add_argument("lesson_dir")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("-q", "--quality", choices=list(QUALITIES), default="m")
+    parser.add_argument("--media_dir", default="media")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument(
+        "-s", "--scenes", nargs="*", default=None,
+        help="Only render these scenes, by name or as module:Scene to render a scene that isn't in the lesson"
+    )
+    parser.add_argument("-n", "--shards", type=int, default=1, help="Split each scene into this many frame ranges")
+    args = parser.parse_args()
+
+    if args.scenes:
+        # module:Scene arguments are rendered as given, without importing the lesson
+        named = [scene for scene in args.scenes if ":" not in scene]
+        discovered = discover_scenes(args.lesson_dir) if named else []
+        missing = set(named) - {scene_name for _, scene_name in discovered}
+        if missing:
+            parser.error("no such scenes in the lesson: " + ", ".join(sorted(missing)))
+        scenes = []
+        for scene in args.scenes:
+            if ":" in scene:
+                scenes.append(tuple(scene.split(":", 1)))
+            else:
+                scenes.extend(found for found in discovered if found[1] == scene)
+    else:
+        scenes = discover_scenes(args.lesson_dir)
+    output = args.output
+    if output is None:
+        output = os.path.join(args.media_dir, os.path.basename(os.path.abspath(args.lesson_dir)) + ".mp4")
+    if args.shards > 1:
+        movie_files = [
+            render_scene_sharded(
+                args.lesson_dir, module_name, scene_name, args.shards, args.workers, args.quality, args.media_dir,
+                os.path.join(args.media_dir, "shards", scene_name + ".mp4")
+            )[1]
+            for module_name, scene_name in scenes
+        ]
+        stitch(movie_files, output)
+    else:
+        render_lesson(args.lesson_dir, args.workers, args.quality, args.media_dir, output, scenes)
@@ -0,0 +1,50 @@
+import pytest
+
+manim = pytest.importorskip("manim")
+
+from manim import RIGHT, Dot, Scene, Square, tempconfig
+from manim.renderer.cairo_renderer import CairoRenderer
+
+from .render import ShardedScene
+
+PLAYS = 3
+FPS = 15
+
+class ThreePlays(Scene):
+    def construct(self):
+        self.add(Square())
+        dot = Dot()
+        self.add(dot)
+        for _ in range(PLAYS):
+            self.play(dot.animate.shift(RIGHT), run_time=1)
+
+def count_draws(monkeypatch, tmp_path, shard):
+    draws = []
+    update_frame = CairoRenderer.update_frame
+    def counted(self, *args, **kwargs):
+        draws.append(1)
+        return update_frame(self, *args, **kwargs)
+    monkeypatch.setattr(CairoRenderer, "update_frame", counted)
+
+    scene_class = type("ThreePlays", (ShardedScene, ThreePlays), {"shard": shard})
+    options = {
+        "frame_rate": FPS,
+        "pixel_width": 160,
+        "pixel_height": 90,
+        "media_dir": str(tmp_path),
+        "write_to_movie": False,
+        "disable_caching": True,
+        "progress_bar": "none",
+    }
+    with tempconfig(options):
+        scene_class().render()
+    return len(draws)
+
+def test_skipped_plays_are_not_drawn(monkeypatch, tmp_path):
+    # Only the last play is in the shard: its frames, plus at most its static frame
+    draws = count_draws(monkeypatch, tmp_path, ((PLAYS - 1) * FPS, PLAYS * FPS))
+    assert draws <= FPS + 1
+
+def test_frames_outside_a_partial_shard_are_not_drawn(monkeypatch, tmp_path):
+    draws = count_draws(monkeypatch, tmp_path, (FPS // 2, FPS))
+    assert draws <= FPS - FPS // 2 + 1